@@ -5,15 +5,103 @@ Handles all SQLite database operations
 
 import sqlite3
 import os
+import csv
+import copy
 import hashlib
+import hmac
 import secrets
-from datetime import datetime, date
-from typing import List, Dict, Optional, Tuple
+import threading
+import queue
+from datetime import datetime, date, timedelta
+from collections import OrderedDict, namedtuple
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import List, Dict, Iterator, Optional, Tuple
 import pandas as pd
 
 
+# Default categories seeded globally and for every new user
+_DEFAULT_CATEGORIES = (
+    ('Food & Dining', 'expense', '🍔', '#FF6B6B'),
+    ('Transport', 'expense', '🚗', '#4ECDC4'),
+    ('Entertainment', 'expense', '🎬', '#45B7D1'),
+    ('Utilities', 'expense', '💡', '#96CEB4'),
+    ('Shopping', 'expense', '🛍️', '#FFEAA7'),
+    ('Healthcare', 'expense', '🏥', '#DDA0DD'),
+    ('Education', 'expense', '📚', '#98D8C8'),
+    ('Savings', 'expense', '💰', '#F7DC6F'),
+    ('Other', 'expense', '📦', '#BDC3C7'),
+    ('Salary', 'income', '💵', '#2ECC71'),
+    ('Freelance', 'income', '💻', '#3498DB'),
+    ('Investment', 'income', '📈', '#9B59B6'),
+    ('Gift', 'income', '🎁', '#E74C3C'),
+    ('Other Income', 'income', '💸', '#1ABC9C'),
+)
+
+
+# A user's categories indexed for direct lookup; shared and read-only
+CategoryIndex = namedtuple('CategoryIndex', ['by_id', 'by_lower_name', 'by_type'])
+
+
+@lru_cache(maxsize=None)
+def _row_type(fields: Tuple[str, ...]):
+    """Return the namedtuple type for a result shape, built once per column set."""
+    return namedtuple('TransactionRow', fields)
+
+
 class DatabaseManager:
     """Manages SQLite database operations for the expense tracker."""
+
+    # Hot statements kept as constants so the same SQL text is reused and
+    # hits the connection's prepared-statement cache
+    INSERT_TRANSACTION_SQL = '''
+        INSERT INTO transactions (amount, description, category_id, transaction_type, date, user_id)
+        VALUES (?, ?, ?, ?, ?, ?)
+    '''
+    INSERT_CATEGORY_SQL = 'INSERT INTO categories (name, type, icon, color, user_id) VALUES (?, ?, ?, ?, ?)'
+    SEED_CATEGORY_SQL = (
+        'INSERT INTO categories (name, type, icon, color, user_id) '
+        'SELECT ?, ?, ?, ?, ? '
+        'WHERE NOT EXISTS (SELECT 1 FROM categories WHERE name = ? AND user_id IS ?)'
+    )
+    SELECT_USER_SQL = 'SELECT * FROM users WHERE username = ?'
+    EXPORT_TRANSACTIONS_SQL = '''
+        SELECT t.*, c.name as category_name
+        FROM transactions t
+        LEFT JOIN categories c ON t.category_id = c.id
+        WHERE t.user_id = ?
+        ORDER BY t.date DESC
+    '''
+    UPSERT_BUDGET_SQL = '''
+        INSERT INTO budgets (category_id, user_id, monthly_limit)
+        VALUES (?, ?, ?)
+        ON CONFLICT(category_id, user_id) DO UPDATE SET monthly_limit = ?
+    '''
+    UPSERT_USER_SETTING_SQL = '''
+        INSERT INTO settings (key, value, user_id)
+        VALUES (?, ?, ?)
+        ON CONFLICT(key, user_id) DO UPDATE SET value = ?
+    '''
+    UPSERT_GLOBAL_SETTING_SQL = '''
+        INSERT INTO settings (key, value, user_id)
+        VALUES (?, ?, NULL)
+        ON CONFLICT(key, user_id) WHERE user_id IS NULL DO UPDATE SET value = ?
+    '''
+    
+    # Storage formats of transaction date columns; explicit formats let
+    # pandas parse them vectorised instead of inferring per value
+    TRANSACTION_DATE_FORMATS = {
+        'date': {'format': '%Y-%m-%d'},
+        'created_at': {'format': '%Y-%m-%d %H:%M:%S'},
+    }
+    # Stored in PRAGMA user_version once one-time setup (global category seed) has run
+    SCHEMA_VERSION = 1
+    PASSWORD_HASH_PREFIX = 'pbkdf2_sha256'
+    PASSWORD_HASH_ITERATIONS = 100_000
+    DASHBOARD_CACHE_SIZE = 128
+    READ_POOL_SIZE = 4
+    # Ids bound per bulk DELETE; SQLite builds before 3.32 allow 999 parameters
+    DELETE_CHUNK_SIZE = 500
     
     def __init__(self, db_path: str = None):
         """Initialize database connection and create tables if needed."""
@@ -26,14 +114,86 @@ class DatabaseManager:
         
         self.db_path = db_path
         self.conn = None
+        
+        # Categories rarely change at runtime, so lookups are cached in-process
+        # keyed by (id, user_id) / (name, user_id)
+        self._cat_lock = threading.Lock()
+        self._cat_by_id: Dict[Tuple, Dict] = {}
+        self._cat_by_name: Dict[Tuple, Dict] = {}
+        self._cat_index: Dict[Optional[int], CategoryIndex] = {}
+        
+        # LRU of get_dashboard results keyed by (user_id, start, end, data_version)
+        self._dashboard_lock = threading.Lock()
+        self._dashboard_cache: OrderedDict = OrderedDict()
+        # Bumped on every transaction or budget write here; see get_transactions_version
+        self._tx_generation = 0
+        
+        # Filter queries have a small fixed set of shapes, so each shape's SQL
+        # is built once and keyed by which filters are present
+        self._tx_sql_cache: Dict[Tuple[bool, ...], str] = {}
+        self._update_tx_sql_cache: Dict[Tuple[bool, ...], str] = {}
         self._connect()
         self._create_tables()
-        self._seed_categories()
+        self._seed_global_categories()
+    
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection with the tuned PRAGMAs applied."""
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA cache_size=-20000')  # ~20 MB page cache
+        conn.execute('PRAGMA mmap_size=268435456')  # 256 MB
+        conn.execute('PRAGMA foreign_keys=ON')
+        return conn
     
     def _connect(self):
-        """Establish database connection."""
-        self.conn = sqlite3.connect(self.db_path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        """Establish the writer connection and the pool of reader connections."""
+        # All writes go through one connection, serialized by a lock
+        self.conn = self._open_connection()
+        self._write_lock = threading.RLock()
+
+        # WAL journal with NORMAL sync: fewer fsyncs per commit and readers
+        # are not blocked by a writer
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        
+        # In-memory databases are private to one connection, so reads share
+        # the writer instead of using a pool
+        self._readers = None
+        if self.db_path != ':memory:':
+            self._readers = queue.Queue()
+            for _ in range(self.READ_POOL_SIZE):
+                self._readers.put(self._open_connection())
+    
+    @contextmanager
+    def _read(self):
+        """Borrow a reader connection from the pool."""
+        if self._readers is None:
+            with self._write_lock:
+                yield self.conn
+            return
+        
+        conn = self._readers.get()
+        try:
+            yield conn
+        finally:
+            self._readers.put(conn)
+    
+    def _read_frame(self, query: str, params: Tuple, **kwargs) -> pd.DataFrame:
+        """Run a read query into a DataFrame on a borrowed reader connection."""
+        with self._read() as conn:
+            # Plain tuple rows let pandas skip converting each sqlite3.Row
+            conn.row_factory = None
+            try:
+                return pd.read_sql_query(query, conn, params=params, **kwargs)
+            finally:
+                conn.row_factory = sqlite3.Row
+    
+    @contextmanager
+    def _write(self):
+        """Hold the writer connection for the duration of a write."""
+        with self._write_lock:
+            yield self.conn
     
     def _create_tables(self):
         """Create necessary tables if they don't exist."""
@@ -104,68 +264,98 @@ class DatabaseManager:
                 FOREIGN KEY (user_id) REFERENCES users(id)
             )
         ''')
-        
+
+        # Indexes for the per-user, date-ranged queries
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_user_date ON transactions(user_id, date DESC)')
+        # Covering index for the type/date-windowed aggregates; it supersedes the
+        # former (user_id, transaction_type, date) index, which is a prefix of it
+        cursor.execute('DROP INDEX IF EXISTS idx_tx_user_type_date')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_cover ON transactions(user_id, transaction_type, date, category_id, amount)')
+        # Covering index for per-category monthly totals; it supersedes the
+        # former (user_id, category_id) index, which is a prefix of it
+        cursor.execute('DROP INDEX IF EXISTS idx_tx_user_cat')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_user_cat_date ON transactions(user_id, category_id, date, amount)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_cat_user ON categories(user_id)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_budgets_user ON budgets(user_id)')
+
         self.conn.commit()
     
     def _seed_categories(self, user_id: int = None):
-        """Seed default categories for a user if their category table is empty."""
-        # This will be called both during init (for any existing global categories) 
-        # and when a new user signs up.
-        cursor = self.conn.cursor()
+        """Seed default categories for a user, skipping any that already exist."""
+        # Init seeds global categories through _seed_global_categories and
+        # register_user seeds inside its own transaction; this re-seeds on demand.
+        # Existing names are skipped per row, so no COUNT pre-check is needed.
+        # NOT EXISTS is used over INSERT OR IGNORE because UNIQUE(name, user_id)
+        # never conflicts on NULL user_id, and ignored inserts still advance
+        # the AUTOINCREMENT sequence.
+        with self._write() as conn, conn:
+            self._insert_default_categories(conn, user_id)
         
-        check_query = 'SELECT COUNT(*) FROM categories WHERE user_id IS NULL' if user_id is None else 'SELECT COUNT(*) FROM categories WHERE user_id = ?'
-        params = () if user_id is None else (user_id,)
-        
-        cursor.execute(check_query, params)
-        
-        if cursor.fetchone()[0] == 0:
-            default_categories = [
-                ('Food & Dining', 'expense', '🍔', '#FF6B6B', user_id),
-                ('Transport', 'expense', '🚗', '#4ECDC4', user_id),
-                ('Entertainment', 'expense', '🎬', '#45B7D1', user_id),
-                ('Utilities', 'expense', '💡', '#96CEB4', user_id),
-                ('Shopping', 'expense', '🛍️', '#FFEAA7', user_id),
-                ('Healthcare', 'expense', '🏥', '#DDA0DD', user_id),
-                ('Education', 'expense', '📚', '#98D8C8', user_id),
-                ('Savings', 'expense', '💰', '#F7DC6F', user_id),
-                ('Other', 'expense', '📦', '#BDC3C7', user_id),
-                ('Salary', 'income', '💵', '#2ECC71', user_id),
-                ('Freelance', 'income', '💻', '#3498DB', user_id),
-                ('Investment', 'income', '📈', '#9B59B6', user_id),
-                ('Gift', 'income', '🎁', '#E74C3C', user_id),
-                ('Other Income', 'income', '💸', '#1ABC9C', user_id),
-            ]
-            
-            cursor.executemany(
-                'INSERT INTO categories (name, type, icon, color, user_id) VALUES (?, ?, ?, ?, ?)',
-                default_categories
-            )
-            self.conn.commit()
+        self._invalidate_category_cache()
+    
+    def _seed_global_categories(self):
+        """Seed global categories once per database, tracked via PRAGMA user_version."""
+        with self._write() as conn, conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] >= self.SCHEMA_VERSION:
+                return
+            self._insert_default_categories(conn, None)
+            conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+        
+        self._invalidate_category_cache()
+    
+    def _insert_default_categories(self, conn: sqlite3.Connection, user_id: Optional[int]):
+        """Insert missing default categories on conn within the caller's transaction."""
+        conn.executemany(
+            self.SEED_CATEGORY_SQL,
+            [(*row, user_id, row[0], user_id) for row in _DEFAULT_CATEGORIES]
+        )
     
     # ==================== User Operations ====================
     
     def _hash_password(self, password: str, salt: str = None) -> Tuple[str, str]:
-        """Hash a password with a salt."""
+        """Hash a password with a salt using PBKDF2-HMAC-SHA256."""
         if salt is None:
             salt = secrets.token_hex(16)
         
-        phash = hashlib.sha256((password + salt).encode()).hexdigest()
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), bytes.fromhex(salt),
+                                     self.PASSWORD_HASH_ITERATIONS)
+        phash = f"{self.PASSWORD_HASH_PREFIX}${self.PASSWORD_HASH_ITERATIONS}${digest.hex()}"
         return phash, salt
+    
+    def _legacy_hash_password(self, password: str, salt: str) -> str:
+        """Hash a password the way accounts created before PBKDF2 were stored."""
+        h = hashlib.sha256()
+        h.update(password.encode('utf-8'))
+        h.update(salt.encode('utf-8'))
+        return h.hexdigest()
+    
+    def _verify_password(self, password: str, salt: str, stored_hash: str) -> bool:
+        """Check a password against a stored PBKDF2 or legacy SHA-256 hash."""
+        if stored_hash.startswith(self.PASSWORD_HASH_PREFIX + '$'):
+            _, iterations, expected = stored_hash.split('$')
+            digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), bytes.fromhex(salt),
+                                         int(iterations))
+            return hmac.compare_digest(digest.hex(), expected)
+        
+        return hmac.compare_digest(self._legacy_hash_password(password, salt), stored_hash)
 
     def register_user(self, username: str, password: str, full_name: str = None) -> Tuple[bool, str]:
         """Register a new user."""
         try:
             phash, salt = self._hash_password(password)
-            cursor = self.conn.cursor()
-            cursor.execute('''
-                INSERT INTO users (username, password_hash, salt, full_name)
-                VALUES (?, ?, ?, ?)
-            ''', (username.lower(), phash, salt, full_name))
-            user_id = cursor.lastrowid
-            self.conn.commit()
+            # The user row and their default categories commit together
+            with self._write() as conn, conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO users (username, password_hash, salt, full_name)
+                    VALUES (?, ?, ?, ?)
+                ''', (username.lower(), phash, salt, full_name))
+                user_id = cursor.lastrowid
+                
+                # Seed categories for the new user
+                self._insert_default_categories(conn, user_id)
             
-            # Seed categories for the new user
-            self._seed_categories(user_id)
+            self._invalidate_category_cache()
             
             return True, "Registration successful"
         except sqlite3.IntegrityError:
@@ -175,14 +365,19 @@ class DatabaseManager:
 
     def authenticate_user(self, username: str, password: str) -> Optional[Dict]:
         """Authenticate a user and return user data if successful."""
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM users WHERE username = ?', (username.lower(),))
-        user = cursor.fetchone()
+        with self._read() as conn:
+            user = conn.execute(self.SELECT_USER_SQL, (username.lower(),)).fetchone()
         
         if user:
             user_dict = dict(user)
-            phash, _ = self._hash_password(password, user_dict['salt'])
-            if phash == user_dict['password_hash']:
+            if self._verify_password(password, user_dict['salt'], user_dict['password_hash']):
+                # Upgrade legacy SHA-256 hashes on successful login
+                if not user_dict['password_hash'].startswith(self.PASSWORD_HASH_PREFIX + '$'):
+                    phash, _ = self._hash_password(password, user_dict['salt'])
+                    with self._write() as conn, conn:
+                        conn.execute('UPDATE users SET password_hash = ? WHERE id = ?',
+                                     (phash, user_dict['id']))
+                
                 # Don't return privacy sensitive data
                 user_data = {
                     'id': user_dict['id'],
@@ -197,8 +392,6 @@ class DatabaseManager:
     
     def get_categories(self, category_type: str = None, user_id: int = None) -> List[Dict]:
         """Get all categories, optionally filtered by type and user."""
-        cursor = self.conn.cursor()
-        
         query = 'SELECT * FROM categories WHERE (user_id = ? OR user_id IS NULL)'
         params = [user_id]
         
@@ -206,14 +399,69 @@ class DatabaseManager:
             query += ' AND type = ?'
             params.append(category_type)
         
-        query += ' ORDER BY type, name'
+        # Defaults exist both globally and per user; the user's copy sorts
+        # first so every by-name lookup settles on the same id
+        query += ' ORDER BY type, name, user_id IS NULL, id'
+        
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+    
+    def get_category_index(self, user_id: int = None) -> CategoryIndex:
+        """
+        Get the user's categories indexed by id, lowercase name and type.
+        
+        Built from one query and cached until categories change. Where a
+        name repeats (user and global copies), by_lower_name keeps the first
+        in get_categories order, which is the user's copy. The index is
+        shared: don't mutate it.
+        """
+        with self._cat_lock:
+            cached = self._cat_index.get(user_id)
+        if cached is not None:
+            return cached
+        
+        index = CategoryIndex(by_id={}, by_lower_name={}, by_type={})
+        for category in self.get_categories(user_id=user_id):
+            index.by_id[category['id']] = category
+            index.by_lower_name.setdefault(category['name'].lower(), category)
+            index.by_type.setdefault(category['type'], []).append(category)
         
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        with self._cat_lock:
+            self._cat_index[user_id] = index
+        return index
+    
+    def get_top_categories(self, user_id: int, k: int = 10, days: int = 30) -> List[Dict]:
+        """
+        Get the user's k most used categories over the last days.
+        
+        Returns:
+            Dicts of id, name, type, icon and uses, most used first; a name the
+            user shares with a global category is listed once, and unused
+            categories fill any remaining slots in type/name order
+        """
+        cutoff = (date.today() - timedelta(days=days)).isoformat()
+        query = '''
+            SELECT MAX(c.id) AS id, c.name, c.type, MAX(c.icon) AS icon, COUNT(t.id) AS uses
+            FROM categories c
+            LEFT JOIN transactions t
+                ON t.category_id = c.id AND t.user_id = ? AND t.date >= ?
+            WHERE (c.user_id = ? OR c.user_id IS NULL)
+            GROUP BY c.name, c.type
+            ORDER BY uses DESC, c.type, c.name
+            LIMIT ?
+        '''
+        
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(query, (user_id, cutoff, user_id, k)).fetchall()]
     
     def get_category_by_id(self, category_id: int, user_id: int = None) -> Optional[Dict]:
         """Get a category by its ID."""
-        cursor = self.conn.cursor()
+        key = (category_id, user_id)
+        with self._cat_lock:
+            cached = self._cat_by_id.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         query = 'SELECT * FROM categories WHERE id = ?'
         params = [category_id]
         
@@ -221,13 +469,24 @@ class DatabaseManager:
             query += ' AND (user_id = ? OR user_id IS NULL)'
             params.append(user_id)
             
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        with self._read() as conn:
+            row = conn.execute(query, params).fetchone()
+        if not row:
+            return None
+        
+        category = dict(row)
+        with self._cat_lock:
+            self._cat_by_id[key] = category
+        return dict(category)
     
     def get_category_by_name(self, name: str, user_id: int = None) -> Optional[Dict]:
         """Get a category by its name."""
-        cursor = self.conn.cursor()
+        key = (name, user_id)
+        with self._cat_lock:
+            cached = self._cat_by_name.get(key)
+        if cached is not None:
+            return dict(cached)
+        
         query = 'SELECT * FROM categories WHERE name = ?'
         params = [name]
         
@@ -235,75 +494,144 @@ class DatabaseManager:
             query += ' AND (user_id = ? OR user_id IS NULL)'
             params.append(user_id)
             
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-        return dict(row) if row else None
+        # Same copy get_category_index picks: the user's before the global
+        query += ' ORDER BY user_id IS NULL, id LIMIT 1'
+        
+        with self._read() as conn:
+            row = conn.execute(query, params).fetchone()
+        if not row:
+            return None
+        
+        category = dict(row)
+        with self._cat_lock:
+            self._cat_by_name[key] = category
+        return dict(category)
+    
+    def _invalidate_category_cache(self):
+        """Drop cached category lookups after categories change."""
+        with self._cat_lock:
+            self._cat_by_id.clear()
+            self._cat_by_name.clear()
+            self._cat_index.clear()
     
     def add_category(self, name: str, category_type: str, user_id: int, icon: str = '📦', color: str = '#BDC3C7') -> int:
         """Add a new category."""
-        cursor = self.conn.cursor()
-        cursor.execute(
-            'INSERT INTO categories (name, type, icon, color, user_id) VALUES (?, ?, ?, ?, ?)',
-            (name, category_type, icon, color, user_id)
-        )
-        self.conn.commit()
+        with self._write() as conn, conn:
+            cursor = conn.execute(self.INSERT_CATEGORY_SQL, (name, category_type, icon, color, user_id))
+        self._invalidate_category_cache()
         return cursor.lastrowid
     
     # ==================== Transaction Operations ====================
     
     def add_transaction(self, amount: float, description: str, category_id: int,
                        transaction_type: str, transaction_date: date, user_id: int) -> int:
-        """Add a new transaction."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO transactions (amount, description, category_id, transaction_type, date, user_id)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (amount, description, category_id, transaction_type, transaction_date, user_id))
-        self.conn.commit()
+        """
+        Add a new transaction.
+        
+        Commits per call; use add_transactions_bulk when inserting many rows.
+        """
+        with self._write() as conn, conn:
+            cursor = conn.execute(
+                self.INSERT_TRANSACTION_SQL,
+                (amount, description, category_id, transaction_type, transaction_date, user_id)
+            )
+        self._invalidate_dashboard_cache()
         return cursor.lastrowid
     
-    def get_transactions(self, user_id: int, start_date: date = None, end_date: date = None,
-                        transaction_type: str = None, category_id: int = None,
-                        limit: int = None) -> List[Dict]:
-        """Get transactions with optional filters."""
-        cursor = self.conn.cursor()
+    def add_transactions_bulk(self, rows: List[Tuple]) -> int:
+        """
+        Add many transactions in a single transaction.
         
-        query = '''
-            SELECT t.*, c.name as category_name, c.icon as category_icon, c.color as category_color
-            FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ?
-        '''
-        params = [user_id]
-        
-        if start_date:
-            query += ' AND t.date >= ?'
-            params.append(start_date)
-        
-        if end_date:
-            query += ' AND t.date <= ?'
-            params.append(end_date)
+        Args:
+            rows: List of (amount, description, category_id, transaction_type, date, user_id) tuples
         
-        if transaction_type:
-            query += ' AND t.transaction_type = ?'
-            params.append(transaction_type)
+        Returns:
+            Number of rows inserted
+        """
+        with self._write() as conn, conn:
+            cursor = conn.executemany(self.INSERT_TRANSACTION_SQL, rows)
+        self._invalidate_dashboard_cache()
+        return cursor.rowcount
+    
+    def _build_transactions_query(self, user_id: int, start_date: date = None, end_date: date = None,
+                                  transaction_type: str = None, category_id: int = None,
+                                  limit: int = None, search: str = None) -> Tuple[str, List]:
+        """Build the filtered transactions query and its parameters."""
+        # Substring match on the description; LIKE wildcards in the search are literal
+        pattern = None
+        if search:
+            escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            pattern = f'%{escaped}%'
+        filters = (start_date, end_date, transaction_type, category_id, pattern, limit)
+        key = tuple(bool(value) for value in filters)
         
-        if category_id:
-            query += ' AND t.category_id = ?'
-            params.append(category_id)
+        query = self._tx_sql_cache.get(key)
+        if query is None:
+            query = '''
+                SELECT t.*, c.name as category_name, c.icon as category_icon, c.color as category_color
+                FROM transactions t
+                LEFT JOIN categories c ON t.category_id = c.id
+                WHERE t.user_id = ?
+            '''
+            has_start, has_end, has_type, has_category, has_search, has_limit = key
+            if has_start:
+                query += ' AND t.date >= ?'
+            if has_end:
+                query += ' AND t.date <= ?'
+            if has_type:
+                query += ' AND t.transaction_type = ?'
+            if has_category:
+                query += ' AND t.category_id = ?'
+            if has_search:
+                query += " AND t.description LIKE ? ESCAPE '\\'"
+            query += ' ORDER BY t.date DESC, t.created_at DESC'
+            if has_limit:
+                query += ' LIMIT ?'
+            self._tx_sql_cache[key] = query
         
-        query += ' ORDER BY t.date DESC, t.created_at DESC'
+        params = [user_id]
+        params.extend(value for value in filters if value)
+        return query, params
+    
+    def get_transactions(self, user_id: int, start_date: date = None, end_date: date = None,
+                        transaction_type: str = None, category_id: int = None,
+                        limit: int = None, search: str = None) -> List[Dict]:
+        """
+        Get transactions with optional filters.
         
-        if limit:
-            query += ' LIMIT ?'
-            params.append(limit)
+        search keeps rows whose description contains it, case-insensitively
+        for ASCII letters (SQLite LIKE).
+        """
+        query, params = self._build_transactions_query(
+            user_id, start_date, end_date, transaction_type, category_id, limit, search
+        )
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+    
+    def iter_transactions(self, user_id: int, start_date: date = None, end_date: date = None,
+                          transaction_type: str = None, category_id: int = None,
+                          limit: int = None, search: str = None) -> Iterator[Tuple]:
+        """
+        Iterate over transactions with optional filters.
         
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        Yields compact TransactionRow namedtuples (t.amount, t.date, ...) one
+        at a time instead of building a list of dicts; use for single-pass
+        iteration over large histories. Call ._asdict() where a dict is needed.
+        A pooled reader connection is held until the iterator is exhausted or closed.
+        """
+        query, params = self._build_transactions_query(
+            user_id, start_date, end_date, transaction_type, category_id, limit, search
+        )
+        with self._read() as conn:
+            # Plain tuples from the cursor, wrapped in a namedtuple cached per column set
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(query, params)
+            row_type = _row_type(tuple(column[0] for column in cursor.description))
+            yield from map(row_type._make, cursor)
     
     def get_transaction_by_id(self, transaction_id: int, user_id: int = None) -> Optional[Dict]:
         """Get a transaction by its ID."""
-        cursor = self.conn.cursor()
         query = '''
             SELECT t.*, c.name as category_name, c.icon as category_icon
             FROM transactions t
@@ -316,63 +644,79 @@ class DatabaseManager:
             query += ' AND t.user_id = ?'
             params.append(user_id)
             
-        cursor.execute(query, params)
-        row = cursor.fetchone()
+        with self._read() as conn:
+            row = conn.execute(query, params).fetchone()
         return dict(row) if row else None
     
     def update_transaction(self, transaction_id: int, user_id: int, amount: float = None,
                           description: str = None, category_id: int = None,
                           transaction_date: date = None) -> bool:
         """Update an existing transaction."""
-        cursor = self.conn.cursor()
-        
-        updates = []
-        params = []
-        
-        if amount is not None:
-            updates.append('amount = ?')
-            params.append(amount)
-        
-        if description is not None:
-            updates.append('description = ?')
-            params.append(description)
-        
-        if category_id is not None:
-            updates.append('category_id = ?')
-            params.append(category_id)
+        columns = ('amount', 'description', 'category_id', 'date')
+        values = (amount, description, category_id, transaction_date)
+        key = tuple(value is not None for value in values)
         
-        if transaction_date is not None:
-            updates.append('date = ?')
-            params.append(transaction_date)
-        
-        if not updates:
+        if not any(key):
             return False
         
+        query = self._update_tx_sql_cache.get(key)
+        if query is None:
+            updates = [f'{column} = ?' for column, present in zip(columns, key) if present]
+            query = f"UPDATE transactions SET {', '.join(updates)} WHERE id = ? AND user_id = ?"
+            self._update_tx_sql_cache[key] = query
+        
+        params = [value for value in values if value is not None]
         params.extend([transaction_id, user_id])
-        query = f"UPDATE transactions SET {', '.join(updates)} WHERE id = ? AND user_id = ?"
-        cursor.execute(query, params)
-        self.conn.commit()
+        with self._write() as conn, conn:
+            cursor = conn.execute(query, params)
+        self._invalidate_dashboard_cache()
         return cursor.rowcount > 0
     
     def delete_transaction(self, transaction_id: int, user_id: int) -> bool:
         """Delete a transaction."""
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM transactions WHERE id = ? AND user_id = ?', (transaction_id, user_id))
-        self.conn.commit()
+        with self._write() as conn, conn:
+            cursor = conn.execute('DELETE FROM transactions WHERE id = ? AND user_id = ?', (transaction_id, user_id))
+        self._invalidate_dashboard_cache()
         return cursor.rowcount > 0
     
+    def delete_transactions_bulk(self, transaction_ids: List[int], user_id: int) -> int:
+        """
+        Delete many transactions in a single transaction.
+        
+        Args:
+            transaction_ids: Ids of the transactions to delete
+            user_id: Owner; ids belonging to other users are left alone
+        
+        Returns:
+            Number of rows deleted
+        """
+        ids = list(transaction_ids)
+        if not ids:
+            return 0
+        
+        deleted = 0
+        with self._write() as conn, conn:
+            # Chunked to stay under SQLite's bound-parameter limit
+            for i in range(0, len(ids), self.DELETE_CHUNK_SIZE):
+                chunk = ids[i:i + self.DELETE_CHUNK_SIZE]
+                cursor = conn.execute(
+                    f"DELETE FROM transactions WHERE user_id = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (user_id, *chunk)
+                )
+                deleted += cursor.rowcount
+        self._invalidate_dashboard_cache()
+        return deleted
+    
     # ==================== Analytics Operations ====================
     
     def get_summary(self, user_id: int, start_date: date = None, end_date: date = None) -> Dict:
         """Get financial summary for a period."""
-        cursor = self.conn.cursor()
-        
         query_base = '''
             SELECT 
-                transaction_type,
-                SUM(amount) as total
+                SUM(CASE WHEN transaction_type = 'income' THEN amount END) as income,
+                SUM(CASE WHEN transaction_type = 'expense' THEN amount END) as expense
             FROM transactions
-            WHERE user_id = ?
+            WHERE user_id = ? AND transaction_type IN ('income', 'expense')
         '''
         params = [user_id]
         
@@ -384,23 +728,140 @@ class DatabaseManager:
             query_base += ' AND date <= ?'
             params.append(end_date)
         
-        query_base += ' GROUP BY transaction_type'
+        with self._read() as conn:
+            row = conn.execute(query_base, params).fetchone()
+        
+        summary = {'income': row['income'] or 0, 'expense': row['expense'] or 0}
+        summary['balance'] = summary['income'] - summary['expense']
+        return summary
+    
+    def get_summary_multi(self, user_id: int, windows: List[Tuple[str, Optional[date]]]) -> Dict[str, Dict]:
+        """
+        Get financial summaries for several periods in a single query.
+        
+        Args:
+            windows: (name, start_date) pairs; a None start_date covers all time
+        
+        Returns:
+            Dict mapping each window name to its income/expense/balance summary
+        """
+        columns = []
+        params = []
+        for i, (_, start_date) in enumerate(windows):
+            for transaction_type in ('income', 'expense'):
+                condition = f"transaction_type = '{transaction_type}'"
+                if start_date:
+                    condition += ' AND date >= ?'
+                    params.append(start_date)
+                columns.append(f'SUM(CASE WHEN {condition} THEN amount END) as w{i}_{transaction_type}')
+        
+        query = f'''
+            SELECT {', '.join(columns)}
+            FROM transactions
+            WHERE user_id = ? AND transaction_type IN ('income', 'expense')
+        '''
+        params.append(user_id)
+        
+        with self._read() as conn:
+            row = conn.execute(query, params).fetchone()
+        
+        summaries = {}
+        for i, (name, _) in enumerate(windows):
+            summary = {'income': row[f'w{i}_income'] or 0, 'expense': row[f'w{i}_expense'] or 0}
+            summary['balance'] = summary['income'] - summary['expense']
+            summaries[name] = summary
+        return summaries
+    
+    def get_dashboard(self, user_id: int, start_date: date = None, end_date: date = None) -> Dict:
+        """
+        Get the period summary and expense breakdown in a single query.
+        
+        Results are cached until transactions change, either through this
+        manager or another connection (see get_transactions_version).
+        
+        Returns:
+            Dict with keys: summary, breakdown
+        """
+        # Taken before the query: if a write lands while it runs, the result
+        # is stored under the old version, which later lookups no longer use
+        key = (user_id, start_date, end_date, self.get_transactions_version())
+        
+        with self._dashboard_lock:
+            if key in self._dashboard_cache:
+                self._dashboard_cache.move_to_end(key)
+                return copy.deepcopy(self._dashboard_cache[key])
+        
+        query = '''
+            SELECT 
+                t.transaction_type,
+                c.id, c.name, c.icon, c.color,
+                SUM(t.amount) as total,
+                COUNT(t.id) as count
+            FROM transactions t
+            LEFT JOIN categories c ON t.category_id = c.id
+            WHERE t.user_id = ?
+        '''
+        params = [user_id]
+        
+        if start_date:
+            query += ' AND t.date >= ?'
+            params.append(start_date)
+        
+        if end_date:
+            query += ' AND t.date <= ?'
+            params.append(end_date)
         
-        cursor.execute(query_base, params)
-        results = cursor.fetchall()
+        query += ' GROUP BY t.transaction_type, c.id ORDER BY total DESC'
         
-        summary = {'income': 0, 'expense': 0, 'balance': 0}
-        for row in results:
-            summary[row['transaction_type']] = row['total'] or 0
+        with self._read() as conn:
+            rows = conn.execute(query, params).fetchall()
         
+        summary = {'income': 0, 'expense': 0}
+        breakdown = []
+        for row in rows:
+            summary[row['transaction_type']] += row['total'] or 0
+            if row['transaction_type'] == 'expense' and row['id'] is not None:
+                breakdown.append({
+                    'id': row['id'],
+                    'name': row['name'],
+                    'icon': row['icon'],
+                    'color': row['color'],
+                    'total': row['total'],
+                    'count': row['count']
+                })
         summary['balance'] = summary['income'] - summary['expense']
-        return summary
+        
+        result = {'summary': summary, 'breakdown': breakdown}
+        with self._dashboard_lock:
+            self._dashboard_cache[key] = result
+            if len(self._dashboard_cache) > self.DASHBOARD_CACHE_SIZE:
+                self._dashboard_cache.popitem(last=False)
+        return copy.deepcopy(result)
+    
+    def _invalidate_dashboard_cache(self):
+        """Drop cached dashboard results after transactions change."""
+        with self._dashboard_lock:
+            self._dashboard_cache.clear()
+            self._tx_generation += 1
+    
+    def get_transactions_version(self) -> Tuple[int, int]:
+        """
+        Get a token that changes whenever transactions or budgets change.
+        
+        Covers writes through this manager and commits from other connections
+        (PRAGMA data_version), so callers can key their own caches on it.
+        """
+        # Own writes don't move this connection's data_version, hence the
+        # generation; data_version is per connection, so read it from the writer
+        with self._dashboard_lock:
+            generation = self._tx_generation
+        with self._write() as conn:
+            data_version = conn.execute('PRAGMA data_version').fetchone()[0]
+        return generation, data_version
     
     def get_category_breakdown(self, user_id: int, start_date: date = None, end_date: date = None,
                                transaction_type: str = 'expense') -> List[Dict]:
         """Get spending/income breakdown by category."""
-        cursor = self.conn.cursor()
-        
         query = '''
             SELECT 
                 c.id, c.name, c.icon, c.color,
@@ -422,171 +883,204 @@ class DatabaseManager:
         
         query += ' GROUP BY c.id ORDER BY total DESC'
         
-        cursor.execute(query, params)
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+    
+    def get_category_breakdown_arrays(self, user_id: int, start_date: date = None,
+                                      transaction_type: str = 'expense') -> Tuple[Tuple[str, ...], Tuple[float, ...]]:
+        """
+        Get the category breakdown as parallel arrays for charting.
+        
+        Returns:
+            (labels, totals) sorted by total descending, where each label is
+            "<icon> <name>" built in SQL
+        """
+        query = '''
+            SELECT c.icon || ' ' || c.name, SUM(t.amount) as total
+            FROM transactions t
+            JOIN categories c ON t.category_id = c.id
+            WHERE t.transaction_type = ? AND t.user_id = ?
+        '''
+        params = [transaction_type, user_id]
+        
+        if start_date:
+            query += ' AND t.date >= ?'
+            params.append(start_date)
+        
+        query += ' GROUP BY c.id ORDER BY total DESC'
+        
+        with self._read() as conn:
+            rows = conn.execute(query, params).fetchall()
+        if not rows:
+            return (), ()
+        labels, totals = zip(*rows)
+        return labels, totals
     
     def get_monthly_trends(self, user_id: int, months: int = 12) -> pd.DataFrame:
         """Get monthly income/expense trends."""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
+        # Cutoff is computed once and bound so the SQL text stays constant
+        cutoff = (pd.Timestamp(date.today()) - pd.DateOffset(months=months)).date().isoformat()
+        df = self._read_frame('''
             SELECT 
                 strftime('%Y-%m', date) as month,
                 transaction_type,
                 SUM(amount) as total
             FROM transactions
-            WHERE user_id = ? AND date >= date('now', ?)
+            WHERE user_id = ? AND date >= ?
             GROUP BY month, transaction_type
             ORDER BY month
-        ''', (user_id, f'-{months} months',))
-        
-        results = cursor.fetchall()
+        ''', (user_id, cutoff))
         
-        if not results:
+        if df.empty:
             return pd.DataFrame(columns=['month', 'income', 'expense'])
         
-        # Pivot the data
-        data = {}
-        for row in results:
-            month = row['month']
-            if month not in data:
-                data[month] = {'month': month, 'income': 0, 'expense': 0}
-            data[month][row['transaction_type']] = row['total']
-        
-        return pd.DataFrame(list(data.values()))
+        # Pivot transaction types into income/expense columns
+        trends = df.pivot_table(index='month', columns='transaction_type', values='total',
+                                aggfunc='sum', fill_value=0)
+        trends = trends.reindex(columns=['income', 'expense'], fill_value=0).reset_index()
+        trends.columns.name = None
+        return trends
+    
+    def get_category_monthly_totals(self, user_id: int, category_id: int, months: int = 6) -> pd.DataFrame:
+        """Get one category's monthly totals as month/total columns."""
+        cutoff = (pd.Timestamp(date.today()) - pd.DateOffset(months=months)).date().isoformat()
+        return self._read_frame('''
+            SELECT 
+                strftime('%Y-%m', date) as month,
+                SUM(amount) as total
+            FROM transactions
+            WHERE user_id = ? AND category_id = ?
+            AND date >= ?
+            GROUP BY month
+            ORDER BY month
+        ''', (user_id, category_id, cutoff))
     
     def get_daily_expenses(self, user_id: int, days: int = 30) -> pd.DataFrame:
         """Get daily expense data for the specified number of days."""
-        cursor = self.conn.cursor()
-        
-        cursor.execute('''
+        cutoff = (date.today() - timedelta(days=days)).isoformat()
+        return self._read_frame('''
             SELECT 
                 date,
                 SUM(amount) as total
             FROM transactions
             WHERE transaction_type = 'expense' AND user_id = ?
-            AND date >= date('now', ?)
+            AND date >= ?
             GROUP BY date
             ORDER BY date
-        ''', (user_id, f'-{days} days',))
-        
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame(columns=['date', 'total'])
-        
-        return pd.DataFrame([dict(row) for row in results])
+        ''', (user_id, cutoff))
     
     def get_transactions_dataframe(self, user_id: int) -> pd.DataFrame:
         """Get all transactions as a pandas DataFrame."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT t.*, c.name as category_name
-            FROM transactions t
-            LEFT JOIN categories c ON t.category_id = c.id
-            WHERE t.user_id = ?
-            ORDER BY t.date DESC
-        ''', (user_id,))
+        return self._read_frame(self.EXPORT_TRANSACTIONS_SQL, (user_id,),
+                                parse_dates=self.TRANSACTION_DATE_FORMATS)
+    
+    def write_transactions_csv(self, user_id: int, out) -> bool:
+        """
+        Write all of a user's transactions as CSV to a text file object.
         
-        results = cursor.fetchall()
-        if not results:
-            return pd.DataFrame()
+        Same rows and columns as get_transactions_dataframe, streamed from the
+        cursor through csv.writer; stored dates are written as they are
+        rather than parsed into a DataFrame and formatted back.
         
-        return pd.DataFrame([dict(row) for row in results])
+        Returns:
+            False if the user has no transactions, in which case nothing is written
+        """
+        with self._read() as conn:
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(self.EXPORT_TRANSACTIONS_SQL, (user_id,))
+            first = cursor.fetchone()
+            if first is None:
+                return False
+            
+            writer = csv.writer(out, lineterminator='\n')
+            writer.writerow([column[0] for column in cursor.description])
+            writer.writerow(first)
+            writer.writerows(cursor)
+        return True
     
     # ==================== Budget Operations ====================
     
     def set_budget(self, category_id: int, user_id: int, monthly_limit: float) -> bool:
         """Set or update budget for a category."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            INSERT INTO budgets (category_id, user_id, monthly_limit)
-            VALUES (?, ?, ?)
-            ON CONFLICT(category_id, user_id) DO UPDATE SET monthly_limit = ?
-        ''', (category_id, user_id, monthly_limit, monthly_limit))
-        self.conn.commit()
+        with self._write() as conn, conn:
+            conn.execute(self.UPSERT_BUDGET_SQL, (category_id, user_id, monthly_limit, monthly_limit))
+        # Budget alerts and status are cached on get_transactions_version too
+        with self._dashboard_lock:
+            self._tx_generation += 1
         return True
     
     def get_budgets(self, user_id: int) -> List[Dict]:
         """Get all budget limits."""
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT b.*, c.name as category_name, c.icon as category_icon
-            FROM budgets b
-            JOIN categories c ON b.category_id = c.id
-            WHERE b.user_id = ?
-        ''', (user_id,))
-        return [dict(row) for row in cursor.fetchall()]
+        with self._read() as conn:
+            rows = conn.execute('''
+                SELECT b.*, c.name as category_name, c.icon as category_icon
+                FROM budgets b
+                JOIN categories c ON b.category_id = c.id
+                WHERE b.user_id = ?
+            ''', (user_id,)).fetchall()
+        return [dict(row) for row in rows]
     
     def get_budget_status(self, user_id: int, month: str = None) -> List[Dict]:
         """Get budget vs actual spending for each category."""
         if month is None:
             month = datetime.now().strftime('%Y-%m')
         
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            SELECT 
-                c.id, c.name, c.icon, c.color,
-                b.monthly_limit,
-                COALESCE(SUM(t.amount), 0) as spent
-            FROM categories c
-            LEFT JOIN budgets b ON c.id = b.category_id AND b.user_id = ?
-            LEFT JOIN transactions t ON c.id = t.category_id 
-                AND t.transaction_type = 'expense'
-                AND t.user_id = ?
-                AND strftime('%Y-%m', t.date) = ?
-            WHERE (c.user_id = ? OR c.user_id IS NULL) AND c.type = 'expense'
-            GROUP BY c.id
-            HAVING b.monthly_limit IS NOT NULL
-        ''', (user_id, user_id, month, user_id))
-        
-        results = []
-        for row in cursor.fetchall():
-            row_dict = dict(row)
-            row_dict['remaining'] = row_dict['monthly_limit'] - row_dict['spent']
-            row_dict['percentage'] = (row_dict['spent'] / row_dict['monthly_limit'] * 100) if row_dict['monthly_limit'] > 0 else 0
-            results.append(row_dict)
-        
-        return results
+        with self._read() as conn:
+            rows = conn.execute('''
+                SELECT 
+                    c.id, c.name, c.icon, c.color,
+                    b.monthly_limit,
+                    COALESCE(SUM(t.amount), 0) as spent,
+                    b.monthly_limit - COALESCE(SUM(t.amount), 0) as remaining,
+                    CASE WHEN b.monthly_limit > 0
+                        THEN COALESCE(SUM(t.amount), 0) / b.monthly_limit * 100
+                        ELSE 0
+                    END as percentage
+                FROM categories c
+                LEFT JOIN budgets b ON c.id = b.category_id AND b.user_id = ?
+                LEFT JOIN transactions t ON c.id = t.category_id 
+                    AND t.transaction_type = 'expense'
+                    AND t.user_id = ?
+                    AND strftime('%Y-%m', t.date) = ?
+                WHERE (c.user_id = ? OR c.user_id IS NULL) AND c.type = 'expense'
+                GROUP BY c.id
+                HAVING b.monthly_limit IS NOT NULL
+            ''', (user_id, user_id, month, user_id)).fetchall()
+        
+        return [dict(row) for row in rows]
     
     # ==================== Settings Operations ====================
     
     def get_setting(self, key: str, user_id: Optional[int] = None, default: str = None) -> Optional[str]:
         """Get a setting value by key."""
-        cursor = self.conn.cursor()
-        if user_id is not None:
-            cursor.execute('SELECT value FROM settings WHERE key = ? AND user_id = ?', (key, user_id))
-        else:
-            cursor.execute('SELECT value FROM settings WHERE key = ? AND user_id IS NULL', (key,))
-        row = cursor.fetchone()
+        with self._read() as conn:
+            if user_id is not None:
+                row = conn.execute('SELECT value FROM settings WHERE key = ? AND user_id = ?', (key, user_id)).fetchone()
+            else:
+                row = conn.execute('SELECT value FROM settings WHERE key = ? AND user_id IS NULL', (key,)).fetchone()
         return row['value'] if row else default
     
     def set_setting(self, key: str, value: str, user_id: Optional[int] = None) -> bool:
         """Set or update a setting value."""
-        cursor = self.conn.cursor()
-        if user_id is not None:
-            cursor.execute('''
-                INSERT INTO settings (key, value, user_id)
-                VALUES (?, ?, ?)
-                ON CONFLICT(key, user_id) DO UPDATE SET value = ?
-            ''', (key, value, user_id, value))
-        else:
-            cursor.execute('''
-                INSERT INTO settings (key, value, user_id)
-                VALUES (?, ?, NULL)
-                ON CONFLICT(key, user_id) WHERE user_id IS NULL DO UPDATE SET value = ?
-            ''', (key, value, value))
-        self.conn.commit()
+        with self._write() as conn, conn:
+            if user_id is not None:
+                conn.execute(self.UPSERT_USER_SETTING_SQL, (key, value, user_id, value))
+            else:
+                conn.execute(self.UPSERT_GLOBAL_SETTING_SQL, (key, value, value))
         return True
     
     def clear_all_data(self, user_id: int):
         """Clear all transaction data for a user."""
-        cursor = self.conn.cursor()
-        cursor.execute('DELETE FROM transactions WHERE user_id = ?', (user_id,))
-        cursor.execute('DELETE FROM budgets WHERE user_id = ?', (user_id,))
-        self.conn.commit()
+        with self._write() as conn, conn:
+            conn.execute('DELETE FROM transactions WHERE user_id = ?', (user_id,))
+            conn.execute('DELETE FROM budgets WHERE user_id = ?', (user_id,))
+        self._invalidate_dashboard_cache()
     
     def close(self):
-        """Close database connection."""
+        """Close database connections."""
+        if self._readers is not None:
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
         if self.conn:
             self.conn.close()
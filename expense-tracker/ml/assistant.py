@@ -4,12 +4,91 @@ Natural language processing for conversational expense management
 """
 
 import re
-from datetime import datetime, date, timedelta
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
 import random
 import google.generativeai as genai
 import json
 
+# RE2 matches in linear time; it's optional and used where a pattern allows
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# orjson parses Gemini's JSON blocks faster when installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+_LOOKAROUND_RE = re.compile(r'\(\?<?[=!]')
+
+
+def _compile(pattern: str, flags: int = 0):
+    """Compile pattern with RE2 when installed and supported, else with re."""
+    # RE2 has no lookaround and takes IGNORECASE only as an inline flag
+    if re2 is not None and not flags & ~re.IGNORECASE and not _LOOKAROUND_RE.search(pattern):
+        try:
+            return re2.compile(('(?i)' if flags else '') + pattern)
+        except re2.error:
+            pass
+    return re.compile(pattern, flags)
+
+
+# Smart-parse tokens: an amount with optional currency marker, or a filler
+# word. One scan finds the amount and everything left over is the description.
+_SMART_TOKEN_RE = _compile(
+    r'(?P<amount>(?:(?:₹|rs\.?|inr)\s*)?(?P<value>\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?)'
+    r'|(?P<keyword>spent|paid|for|on|at|expense|income)'
+)
+
+# Action block in a Gemini reply: fenced ```json first, else the first flat {...}
+_JSON_FENCE_RE = re.compile(r'```json\s*(\{.*?\})\s*```', re.DOTALL)
+_JSON_BARE_RE = re.compile(r'(\{[^{}]*\})')
+
+
+class _RequestCache:
+    """
+    Database proxy that memoizes reads for the duration of one message.
+    
+    Any other method call may write, so it clears the memoized reads.
+    """
+    
+    CACHED_READS = frozenset({
+        'get_summary', 'get_categories', 'get_category_index', 'get_top_categories',
+        'get_category_by_name', 'get_category_breakdown', 'get_setting',
+    })
+    
+    def __init__(self, db):
+        self._db = db
+        self._results = {}
+    
+    def __getattr__(self, name):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+        
+        if name not in self.CACHED_READS:
+            def call(*args, **kwargs):
+                self._results.clear()
+                return attr(*args, **kwargs)
+            return call
+        
+        def cached(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            if key not in self._results:
+                self._results[key] = attr(*args, **kwargs)
+            return self._results[key]
+        return cached
+
 
 class AIAssistant:
     """
@@ -17,29 +96,79 @@ class AIAssistant:
     Understands user intent and automates transaction entry.
     """
     
+    # Gemini replies are cached process-wide, since the app builds a new
+    # assistant on every rerun, keyed by (user_id, message, month, finances)
+    RESPONSE_CACHE_SIZE = 512
+    RESPONSE_CACHE_TTL = 300
+    _response_cache: OrderedDict = OrderedDict()
+    _response_cache_lock = threading.Lock()
+    
+    # Fixed Gemini instructions, sent as the model's system instruction so
+    # each turn's prompt only carries the user's figures and message
+    GEMINI_SYSTEM_PROMPT = (
+        "You are an AI Expense Assistant for a personal finance app.\n"
+        "1. If the user wants to add an expense/income, extract \"amount\", \"description\", and \"category\".\n"
+        "2. If the user asks a question about their spending, answer based on the summary provided.\n"
+        "3. Keep responses helpful, concise, and friendly. Use emojis.\n"
+        "4. If adding a transaction, return a JSON block at the end with keys: "
+        "\"action\" (add_expense/add_income), \"amount\", \"description\", \"category\"."
+    )
+    # Categories listed in a prompt, most used first
+    PROMPT_CATEGORY_LIMIT = 10
+    
+    # Gemini API keys are re-read at most once a minute per user, and one
+    # model per key is shared by every user and rerun. genai.configure() is
+    # process-global, so it only runs when the active key changes.
+    API_KEY_TTL = 60
+    _api_keys: Dict[int, Tuple[Optional[str], float]] = {}
+    _models: Dict[Tuple[str, Optional[str]], object] = {}
+    _configured_key: Optional[str] = None
+    _genai_lock = threading.Lock()
+    
+    # Greeting replies, one picked at random per greeting
+    GREETINGS = (
+        "Hello! 👋 I'm your AI expense assistant. How can I help you today?",
+        "Hi there! 💰 I'm here to help manage your finances. What would you like to do?",
+        "Hey! 🤖 Ready to help with your expenses. Just tell me what you need!",
+    )
+    
+    # Fallback replies, one per suggestion, formatted once at import
+    FALLBACK_SUGGESTIONS = (
+        "Try saying 'Spent ₹500 on groceries'",
+        "Try 'What's my balance?'",
+        "Try 'Show my recent expenses'",
+    )
+    FALLBACK_RESPONSES = tuple(
+        f"""🤔 I'm not sure I understood that correctly.
+
+{suggestion}
+
+Type **'help'** to see all the things I can do! 💡"""
+        for suggestion in FALLBACK_SUGGESTIONS
+    )
+    
+    # Per-user category list for Gemini prompts, rebuilt only when categories change
+    _cat_list_cache: Dict[int, Tuple[Tuple, str]] = {}
+    
+    # Runs the independent database reads behind a Gemini prompt side by side
+    _prefetch_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='assistant-prefetch')
+    
     def __init__(self, db_manager, categorizer):
         """Initialize with database and categorizer."""
         self.db = db_manager
         self.categorizer = categorizer
         
-        # Greeting responses
-        self.greetings = [
-            "Hello! 👋 I'm your AI expense assistant. How can I help you today?",
-            "Hi there! 💰 I'm here to help manage your finances. What would you like to do?",
-            "Hey! 🤖 Ready to help with your expenses. Just tell me what you need!",
-        ]
-        
         # Intent patterns for natural language understanding
-        self.intent_patterns = {
+        raw_intent_patterns = {
             'add_expense': [
-                r'(?:i\s+)?(?:spent|paid|bought|purchased|expense[d]?)\s+(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?\s*(?:on|for|at)?\s*(.+)?',
-                r'(?:add|record|log)\s+(?:an?\s+)?expense\s+(?:of\s+)?(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?\s*(?:for|on)?\s*(.+)?',
-                r'(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?\s+(?:spent\s+)?(?:on|for|at)\s+(.+)',
+                r'(?:i\s+)?(?:spent|paid|bought|purchased|expense[d]?)\s+(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?\s*(?:on|for|at)?\s*(.+)?',
+                r'(?:add|record|log)\s+(?:an?\s+)?expense\s+(?:of\s+)?(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?\s*(?:for|on)?\s*(.+)?',
+                r'(?<!\d)(?<!\d\.)(\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?\s+(?:spent\s+)?(?:on|for|at)\s+(.+)',
             ],
             'add_income': [
-                r'(?:i\s+)?(?:received|got|earned|income)\s+(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?\s*(?:from|as|for)?\s*(.+)?',
-                r'(?:add|record|log)\s+(?:an?\s+)?income\s+(?:of\s+)?(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?\s*(?:from|as)?\s*(.+)?',
-                r'salary\s+(?:of\s+)?(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)',
+                r'(?:i\s+)?(?:received|got|earned|income)\s+(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?\s*(?:from|as|for)?\s*(.+)?',
+                r'(?:add|record|log)\s+(?:an?\s+)?income\s+(?:of\s+)?(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)(?:\s*(?:₹|rs\.?|inr))?\s*(?:from|as)?\s*(.+)?',
+                r'salary\s+(?:of\s+)?(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)',
             ],
             'check_balance': [
                 r'(?:what\'?s?\s+)?(?:my\s+)?(?:current\s+)?balance',
@@ -56,8 +185,8 @@ class AIAssistant:
                 r'what\s+did\s+i\s+(?:spend|buy)\s+(?:recently|today|yesterday)',
             ],
             'set_budget': [
-                r'set\s+(?:a\s+)?budget\s+(?:of\s+)?(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:for\s+)?(.+)?',
-                r'budget\s+(.+)\s+(?:to|at)\s+(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)',
+                r'set\s+(?:a\s+)?budget\s+(?:of\s+)?(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)\s*(?:for\s+)?(.+)?',
+                r'budget\s+(.+)\s+(?:to|at)\s+(?:(?:₹|rs\.?|inr)\s*)?(\d+(?:\.\d{1,2})?)',
             ],
             'greeting': [
                 r'^(?:hi|hello|hey|hola|greetings)[\s!]*$',
@@ -71,111 +200,315 @@ class AIAssistant:
             ],
         }
         
+        # Currency markers take their own adjacent whitespace and the bare-number
+        # pattern only starts at a number boundary, so no two quantifiers compete
+        # for the same characters and failed matches stay linear in the input.
+        # Compile once so each chat turn only runs the matchers
+        self.intent_patterns = {
+            intent: [_compile(pattern, re.IGNORECASE) for pattern in patterns]
+            for intent, patterns in raw_intent_patterns.items()
+        }
+        
+        # Intents detected by matching alone, in dispatch priority order
+        self.dispatch_intents = [
+            'greeting', 'help', 'thanks', 'check_balance', 'check_spending', 'recent_transactions',
+        ]
+        # All of them in one alternation scanned once per message. Each pattern
+        # sits in a zero-width lookahead so every position reports its
+        # highest-priority intent, not just the leftmost match overall.
+        self._intent_dispatch_re = _compile('|'.join(
+            f'(?=(?P<{intent}__{i}>{pattern}))'
+            for intent in self.dispatch_intents
+            for i, pattern in enumerate(raw_intent_patterns[intent])
+        ), re.IGNORECASE)
+        # Whole-message greetings and thanks, the most common chat turns,
+        # answered by set lookup before the dispatch scan
+        self._greeting_words = frozenset({
+            'hi', 'hello', 'hey', 'hola', 'greetings', 'good morning', 'good afternoon', 'good evening',
+        })
+        self._thanks_words = frozenset({'thanks', 'thank', 'thank you', 'thx', 'ty'})
+        
         # Quick action keywords for simple parsing
         self.expense_keywords = ['spent', 'paid', 'bought', 'purchased', 'expense', 'cost']
         self.income_keywords = ['received', 'earned', 'got', 'income', 'salary', 'paid']
         
+        # Common one-word descriptions mapped straight to their category,
+        # skipping the categorizer (values match what it would predict)
+        self._fast_category = {
+            'coffee': 'Food & Dining', 'tea': 'Food & Dining', 'lunch': 'Food & Dining',
+            'dinner': 'Food & Dining', 'breakfast': 'Food & Dining', 'pizza': 'Food & Dining',
+            'groceries': 'Food & Dining', 'food': 'Food & Dining', 'snacks': 'Food & Dining',
+            'uber': 'Transport', 'ola': 'Transport', 'taxi': 'Transport', 'cab': 'Transport',
+            'petrol': 'Transport', 'fuel': 'Transport', 'metro': 'Transport', 'bus': 'Transport',
+            'movie': 'Entertainment', 'movies': 'Entertainment', 'netflix': 'Entertainment',
+            'rent': 'Utilities', 'electricity': 'Utilities', 'internet': 'Utilities',
+            'shopping': 'Shopping', 'clothes': 'Shopping',
+            'medicine': 'Healthcare', 'doctor': 'Healthcare',
+            'salary': 'Salary', 'bonus': 'Salary', 'freelance': 'Freelance',
+            'dividend': 'Investment', 'interest': 'Investment',
+        }
+        
         # Gemini setup
         self.api_key = None
         self.model = None
+        
+        # Date pinned for the message being handled (see _request_scope)
+        self._request_today = None
     
-    def process_message(self, message: str, user_id: int) -> Dict:
+    def process_message(self, message: str, user_id: int, stream: bool = False) -> Dict:
         """
         Process user message and return appropriate response with action.
         
+        Args:
+            stream: Stream Gemini replies; the result then also has a 'stream'
+                generator of text chunks (see _stream_with_gemini)
+        
         Returns:
             Dict with keys: response, action, data
         """
         message = message.strip().lower()
         
-        # Re-check API key in case it was updated in settings
-        self.api_key = self.db.get_setting('gemini_api_key', user_id=user_id)
-        if self.api_key and not self.model:
-            try:
-                genai.configure(api_key=self.api_key)
-                self.model = genai.GenerativeModel('gemini-1.5-flash')
-            except Exception:
-                pass
+        with self._request_scope():
+            # Re-check API key in case it was updated in settings
+            self.api_key = self._get_api_key(user_id)
+            if self.api_key:
+                try:
+                    self._configure_genai(self.api_key)
+                    if not self.model:
+                        self.model = self._get_model(self.api_key, self.GEMINI_SYSTEM_PROMPT)
+                except Exception as e:
+                    # Falls back to the regex assistant, but say why
+                    print(f"Gemini setup error: {e}")
 
-        if self.model:
-            return self._process_with_gemini(message, user_id)
-        
-        # Fallback to local regex-based logic
-        return self._process_with_regex(message, user_id)
+            if self.model:
+                if stream:
+                    return self._stream_with_gemini(message, user_id)
+                return self._process_with_gemini(message, user_id)
+            
+            # Fallback to local regex-based logic
+            return self._process_with_regex(message, user_id)
 
+    @contextmanager
+    def _request_scope(self, today: date = None):
+        """Memoize database reads and pin today's date while handling one message."""
+        db = self.db
+        self.db = _RequestCache(db)
+        self._request_today = today or date.today()
+        try:
+            yield
+        finally:
+            self.db = db
+            self._request_today = None
+    
+    def _today(self) -> date:
+        """Today's date, read once per message inside a request scope."""
+        return self._request_today or date.today()
+    
+    def _get_api_key(self, user_id: int) -> Optional[str]:
+        """Return the user's Gemini API key, re-reading settings every API_KEY_TTL seconds."""
+        cached = self._api_keys.get(user_id)
+        if cached is not None and time.monotonic() - cached[1] < self.API_KEY_TTL:
+            return cached[0]
+        
+        api_key = self.db.get_setting('gemini_api_key', user_id=user_id)
+        self._api_keys[user_id] = (api_key, time.monotonic())
+        return api_key
+    
+    @classmethod
+    def forget_api_key(cls, user_id: int):
+        """Drop the cached API key for user_id, e.g. after it is changed in settings."""
+        cls._api_keys.pop(user_id, None)
+    
+    @classmethod
+    def _configure_genai(cls, api_key: str):
+        """Point the Gemini SDK at api_key unless it already is."""
+        with cls._genai_lock:
+            if cls._configured_key != api_key:
+                genai.configure(api_key=api_key)
+                cls._configured_key = api_key
+    
+    @classmethod
+    def _get_model(cls, api_key: str, system_instruction: Optional[str] = None):
+        """Return the shared Gemini model for api_key, configuring the SDK for it."""
+        cls._configure_genai(api_key)
+        key = (api_key, system_instruction)
+        with cls._genai_lock:
+            model = cls._models.get(key)
+            if model is None:
+                model = genai.GenerativeModel('gemini-1.5-flash', system_instruction=system_instruction)
+                cls._models[key] = model
+        return model
+    
     def _process_with_gemini(self, message: str, user_id: int) -> Dict:
         """Process message using Google Gemini AI."""
-        current_month = datetime.now().strftime('%B %Y')
-        summary = self.db.get_summary(user_id=user_id, start_date=date.today().replace(day=1))
-        categories = self.db.get_categories(user_id=user_id)
-        cat_list = ", ".join([f"{c['name']} ({c['type']})" for c in categories])
-        
-        prompt = f"""
-        You are an AI Expense Assistant for a personal finance app.
-        Current Month: {current_month}
-        User Current Balance: ₹{summary['balance']:.2f}
-        Income this month: ₹{summary['income']:.2f}
-        Expenses this month: ₹{summary['expense']:.2f}
-        Available Categories: {cat_list}
-
-        Tasks:
-        1. If the user wants to add an expense/income, extract "amount", "description", and "category".
-        2. If the user asks a question about their spending, answer based on the summary provided.
-        3. Keep responses helpful, concise, and friendly. Use emojis.
-        4. If adding a transaction, return a JSON block at the end with keys: "action" (add_expense/add_income), "amount", "description", "category".
-
-        User Message: "{message}"
-        """
+        prompt, cache_key = self._build_gemini_prompt(message, user_id)
         
         try:
-            response = self.model.generate_content(prompt)
-            text = response.text
-            
-            # Extract JSON if present
-            action = 'chat'
-            data = None
+            text = self._get_cached_response(cache_key)
+            if text is None:
+                response = self.model.generate_content(prompt)
+                text = response.text
+                self._cache_response(cache_key, text)
             
-            json_match = re.search(r'```json\s*(\{.*?\})\s*```', text, re.DOTALL)
-            if not json_match:
-                json_match = re.search(r'(\{.*?\})', text, re.DOTALL)
-                
-            if json_match:
-                try:
-                    js_data = json.loads(json_match.group(1))
-                    if js_data.get('action') == 'add_expense':
-                        return self._handle_add_expense({'amount': js_data['amount'], 'description': js_data['description']}, user_id)
-                    elif js_data.get('action') == 'add_income':
-                        return self._handle_add_income({'amount': js_data['amount'], 'description': js_data['description']}, user_id)
-                except:
-                    pass
-            
-            return {
-                'response': text,
-                'action': action,
-                'data': data
-            }
+            return self._finish_gemini_response(text, user_id)
         except Exception as e:
             # Fallback to regex if Gemini fails
             print(f"Gemini error: {e}")
             return self._process_with_regex(message, user_id)
+    
+    def _stream_with_gemini(self, message: str, user_id: int) -> Dict:
+        """
+        Process message using Google Gemini AI, streaming the reply.
+        
+        Returns:
+            Dict with keys: response, action, data, stream. stream yields text
+            chunks as they arrive; the other keys are filled in once it has
+            been consumed.
+        """
+        # Built now, inside process_message's request scope; the generator
+        # only runs later, when the caller iterates it
+        prompt, cache_key = self._build_gemini_prompt(message, user_id)
+        
+        result = {'response': None, 'action': 'chat', 'data': None}
+        result['stream'] = self._stream_gemini_chunks(message, user_id, prompt, cache_key, self._today(), result)
+        return result
+    
+    def _stream_gemini_chunks(self, message: str, user_id: int, prompt: str, cache_key: Tuple,
+                              today: date, result: Dict) -> Iterator[str]:
+        """
+        Yield Gemini reply chunks, then store the processed reply in result.
+        
+        Consumed after process_message has returned and left its request
+        scope, so it opens its own, pinned to the day the prompt was built for.
+        """
+        with self._request_scope(today):
+            try:
+                text = self._get_cached_response(cache_key)
+                if text is None:
+                    chunks = []
+                    for chunk in self.model.generate_content(prompt, stream=True):
+                        chunks.append(chunk.text)
+                        yield chunk.text
+                    text = ''.join(chunks)
+                    self._cache_response(cache_key, text)
+                else:
+                    yield text
+                
+                final = self._finish_gemini_response(text, user_id)
+            except Exception as e:
+                # Fallback to regex if Gemini fails
+                print(f"Gemini error: {e}")
+                final = self._process_with_regex(message, user_id)
+                yield final['response']
+        
+        result.update(final)
+    
+    def _build_gemini_prompt(self, message: str, user_id: int) -> Tuple[str, Tuple]:
+        """Build the Gemini prompt for message and its response-cache key."""
+        today = self._today()
+        current_month = today.strftime('%B %Y')
+        summary_future = self._prefetch_pool.submit(
+            self.db.get_summary, user_id=user_id, start_date=today.replace(day=1)
+        )
+        categories_future = self._prefetch_pool.submit(
+            self.db.get_top_categories, user_id, k=self.PROMPT_CATEGORY_LIMIT
+        )
+        summary = summary_future.result()
+        categories = categories_future.result()
+        cat_list = self._category_list(user_id, categories)
+        
+        prompt = (
+            f"Month: {current_month}\n"
+            f"Balance: ₹{summary['balance']:.0f}; income ₹{summary['income']:.0f}; "
+            f"expenses ₹{summary['expense']:.0f}\n"
+            f"Categories: {cat_list}\n"
+            f"User: \"{message}\""
+        )
+        
+        # Balance/expense are bucketed so the cache only turns over when
+        # finances change materially
+        cache_key = (
+            user_id, ' '.join(message.split()), current_month,
+            round(summary['balance'], -1), round(summary['expense'], -1)
+        )
+        return prompt, cache_key
+    
+    def _category_list(self, user_id: int, categories: List[Dict]) -> str:
+        """Return the prompt's "name (type)" category list, reusing the last one built."""
+        fingerprint = tuple((c['id'], c['name'], c['type']) for c in categories)
+        cached = self._cat_list_cache.get(user_id)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+        
+        cat_list = ", ".join(f"{c['name']} ({c['type']})" for c in categories)
+        self._cat_list_cache[user_id] = (fingerprint, cat_list)
+        return cat_list
+    
+    def _finish_gemini_response(self, text: str, user_id: int) -> Dict:
+        """Run any transaction action embedded in a Gemini reply and wrap it."""
+        # Extract JSON if present
+        action = 'chat'
+        data = None
+        
+        json_match = None
+        if '{' in text:
+            json_match = _JSON_FENCE_RE.search(text) or _JSON_BARE_RE.search(text)
+            
+        if json_match:
+            try:
+                js_data = _json_loads(json_match.group(1))
+                if js_data.get('action') == 'add_expense':
+                    return self._handle_add_expense({'amount': js_data['amount'], 'description': js_data['description']}, user_id)
+                elif js_data.get('action') == 'add_income':
+                    return self._handle_add_income({'amount': js_data['amount'], 'description': js_data['description']}, user_id)
+            except:
+                pass
+        
+        return {
+            'response': text,
+            'action': action,
+            'data': data
+        }
+
+    def _get_cached_response(self, key: Tuple) -> Optional[str]:
+        """Return a cached Gemini reply for key if it has not expired."""
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at < time.monotonic():
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+            return text
+    
+    def _cache_response(self, key: Tuple, text: str):
+        """Store a Gemini reply, evicting the least recently used entry when full."""
+        with self._response_cache_lock:
+            self._response_cache[key] = (time.monotonic() + self.RESPONSE_CACHE_TTL, text)
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.RESPONSE_CACHE_SIZE:
+                self._response_cache.popitem(last=False)
 
     def _process_with_regex(self, message: str, user_id: int) -> Dict:
         """Existing regex-based processing logic."""
+        intent = self._detect_intent(message)
         
         # Check for greeting
-        if self._match_intent(message, 'greeting'):
+        if intent == 'greeting':
             return {
-                'response': random.choice(self.greetings),
+                'response': random.choice(self.GREETINGS),
                 'action': 'greeting',
                 'data': None
             }
         
         # Check for help
-        if self._match_intent(message, 'help'):
+        if intent == 'help':
             return self._get_help_response()
         
         # Check for thanks
-        if self._match_intent(message, 'thanks'):
+        if intent == 'thanks':
             return {
                 'response': "You're welcome! 😊 Let me know if you need anything else!",
                 'action': 'thanks',
@@ -193,15 +526,15 @@ class AIAssistant:
             return self._handle_add_income(income_data, user_id)
         
         # Check for balance query
-        if self._match_intent(message, 'check_balance'):
+        if intent == 'check_balance':
             return self._handle_check_balance(user_id)
         
         # Check for spending query
-        if self._match_intent(message, 'check_spending'):
+        if intent == 'check_spending':
             return self._handle_check_spending(message, user_id)
         
         # Check for recent transactions
-        if self._match_intent(message, 'recent_transactions'):
+        if intent == 'recent_transactions':
             return self._handle_recent_transactions(user_id)
         
         # Check for budget setting
@@ -217,18 +550,29 @@ class AIAssistant:
         # Fallback
         return self._get_fallback_response(message)
     
-    def _match_intent(self, message: str, intent: str) -> bool:
-        """Check if message matches an intent pattern."""
-        patterns = self.intent_patterns.get(intent, [])
-        for pattern in patterns:
-            if re.search(pattern, message, re.IGNORECASE):
-                return True
-        return False
+    def _detect_intent(self, message: str) -> Optional[str]:
+        """Return the highest-priority dispatch intent matched in message, if any."""
+        stripped = ' '.join(message.rstrip('! \t\r\n').split())
+        if stripped in self._greeting_words:
+            return 'greeting'
+        if stripped.rstrip('. ') in self._thanks_words:
+            return 'thanks'
+        
+        best = None
+        for match in self._intent_dispatch_re.finditer(message):
+            rank = self.dispatch_intents.index(match.lastgroup.split('__')[0])
+            if best is None or rank < best:
+                best = rank
+                if best == 0:
+                    break
+        return self.dispatch_intents[best] if best is not None else None
     
     def _extract_expense(self, message: str) -> Optional[Dict]:
         """Extract expense details from message."""
+        if not any(ch.isdigit() for ch in message):
+            return None
         for pattern in self.intent_patterns['add_expense']:
-            match = re.search(pattern, message, re.IGNORECASE)
+            match = pattern.search(message)
             if match:
                 groups = match.groups()
                 amount = float(groups[0]) if groups[0] else None
@@ -240,8 +584,10 @@ class AIAssistant:
     
     def _extract_income(self, message: str) -> Optional[Dict]:
         """Extract income details from message."""
+        if not any(ch.isdigit() for ch in message):
+            return None
         for pattern in self.intent_patterns['add_income']:
-            match = re.search(pattern, message, re.IGNORECASE)
+            match = pattern.search(message)
             if match:
                 groups = match.groups()
                 amount = float(groups[0]) if groups[0] else None
@@ -253,8 +599,10 @@ class AIAssistant:
     
     def _extract_budget(self, message: str) -> Optional[Dict]:
         """Extract budget details from message."""
+        if not any(ch.isdigit() for ch in message):
+            return None
         for pattern in self.intent_patterns['set_budget']:
-            match = re.search(pattern, message, re.IGNORECASE)
+            match = pattern.search(message)
             if match:
                 groups = match.groups()
                 # Pattern might have amount first or category first
@@ -271,15 +619,23 @@ class AIAssistant:
     
     def _smart_parse(self, message: str, user_id: int) -> Optional[Dict]:
         """Smart parsing for messages that don't match patterns."""
-        # Look for any number in the message
-        amount_match = re.search(r'(?:₹|rs\.?|inr)?\s*(\d+(?:\.\d{1,2})?)\s*(?:₹|rs\.?|inr)?', message)
-        
-        if amount_match:
-            amount = float(amount_match.group(1))
-            
-            # Remove the amount from message to get description
-            description = re.sub(r'(?:₹|rs\.?|inr)?\s*\d+(?:\.\d{1,2})?\s*(?:₹|rs\.?|inr)?', '', message).strip()
-            description = re.sub(r'(?:spent|paid|for|on|at|expense|income)\s*', '', description).strip()
+        # Chat that fell through every intent is mostly digit-free; no amount, no scan
+        if not any(ch.isdigit() for ch in message):
+            return None
+        
+        # Single pass: take the first amount and keep the text between tokens
+        amount = None
+        parts = []
+        last = 0
+        for match in _SMART_TOKEN_RE.finditer(message):
+            parts.append(message[last:match.start()])
+            last = match.end()
+            if amount is None and match.group('value'):
+                amount = float(match.group('value'))
+        parts.append(message[last:])
+        
+        if amount is not None:
+            description = ' '.join(''.join(parts).split())
             
             if amount > 0:
                 # Determine if it's income or expense based on keywords
@@ -292,37 +648,48 @@ class AIAssistant:
         
         return None
     
+    def _categorize(self, description: str) -> str:
+        """Return a category name, using the fast keyword table before the categorizer."""
+        if description:
+            fast = self._fast_category.get(description.strip().lower())
+            if fast:
+                return fast
+        category_name, _ = self.categorizer.predict(description)
+        return category_name
+    
     def _handle_add_expense(self, data: Dict, user_id: int) -> Dict:
         """Handle adding an expense."""
         amount = data['amount']
         description = data.get('description', 'Expense')
+        title_desc = description.title() if description else 'Expense'
+        today = self._today()
         
         # Use AI to categorize
-        category_name, confidence = self.categorizer.predict(description)
+        category_name = self._categorize(description)
         
         # Get category from database
         category = self.db.get_category_by_name(category_name, user_id=user_id)
         if not category:
             # Fallback to 'Other' category
-            categories = self.db.get_categories('expense', user_id=user_id)
+            categories = self.db.get_category_index(user_id=user_id).by_type.get('expense', [])
             category = next((c for c in categories if 'Other' in c['name']), categories[0])
         
         # Add transaction
         transaction_id = self.db.add_transaction(
             amount=amount,
-            description=description.title() if description else 'Expense',
+            description=title_desc,
             category_id=category['id'],
             transaction_type='expense',
-            transaction_date=date.today(),
+            transaction_date=today,
             user_id=user_id
         )
         
         response = f"""✅ **Expense Added Successfully!**
 
 💸 **Amount:** ₹{amount:,.2f}
-📝 **Description:** {description.title() if description else 'Expense'}
+📝 **Description:** {title_desc}
 🏷️ **Category:** {category.get('icon', '📦')} {category['name']}
-📅 **Date:** {date.today().strftime('%d %b %Y')}
+📅 **Date:** {today.strftime('%d %b %Y')}
 
 *I categorized this as {category['name']} based on your description.*
 
@@ -343,15 +710,17 @@ Would you like to add another expense or check your balance?"""
         """Handle adding income."""
         amount = data['amount']
         description = data.get('description', 'Income')
+        title_desc = description.title() if description else 'Income'
+        today = self._today()
         
         # Categorize income
-        category_name, _ = self.categorizer.predict(description)
+        category_name = self._categorize(description)
         
         # Get income category
         category = self.db.get_category_by_name(category_name, user_id=user_id)
         if not category or category.get('type') != 'income':
             # Fallback to salary or other income
-            categories = self.db.get_categories('income', user_id=user_id)
+            categories = self.db.get_category_index(user_id=user_id).by_type.get('income', [])
             if 'salary' in description.lower():
                 category = next((c for c in categories if 'Salary' in c['name']), categories[0])
             else:
@@ -367,19 +736,19 @@ Would you like to add another expense or check your balance?"""
         # Add transaction
         transaction_id = self.db.add_transaction(
             amount=amount,
-            description=description.title() if description else 'Income',
+            description=title_desc,
             category_id=category['id'],
             transaction_type='income',
-            transaction_date=date.today(),
+            transaction_date=today,
             user_id=user_id
         )
         
         response = f"""✅ **Income Added Successfully!**
 
 💵 **Amount:** ₹{amount:,.2f}
-📝 **Description:** {description.title() if description else 'Income'}
+📝 **Description:** {title_desc}
 🏷️ **Category:** {category.get('icon', '💰')} {category['name']}
-📅 **Date:** {date.today().strftime('%d %b %Y')}
+📅 **Date:** {today.strftime('%d %b %Y')}
 
 Great! Your income has been recorded. 🎉"""
         
@@ -396,18 +765,19 @@ Great! Your income has been recorded. 🎉"""
     
     def _handle_check_balance(self, user_id: int) -> Dict:
         """Handle balance check request."""
-        current_month = date.today().replace(day=1)
-        summary = self.db.get_summary(user_id=user_id, start_date=current_month)
+        current_month = self._today().replace(day=1)
         
-        # Get overall summary too
-        overall = self.db.get_summary(user_id=user_id)
+        # This month and all-time summaries in one query
+        summaries = self.db.get_summary_multi(user_id, [('month', current_month), ('all', None)])
+        summary = summaries['month']
+        overall = summaries['all']
         
         balance = summary['balance']
         status_emoji = "🟢" if balance >= 0 else "🔴"
         
         response = f"""📊 **Your Financial Summary**
 
-**This Month ({datetime.now().strftime('%B %Y')}):**
+**This Month ({current_month.strftime('%B %Y')}):**
 {status_emoji} Balance: ₹{balance:,.2f}
 💵 Income: ₹{summary['income']:,.2f}
 💸 Expenses: ₹{summary['expense']:,.2f}
@@ -425,7 +795,7 @@ Great! Your income has been recorded. 🎉"""
     
     def _handle_check_spending(self, message: str, user_id: int) -> Dict:
         """Handle spending check request."""
-        current_month = date.today().replace(day=1)
+        current_month = self._today().replace(day=1)
         breakdown = self.db.get_category_breakdown(user_id=user_id, start_date=current_month)
         
         if not breakdown:
@@ -438,19 +808,19 @@ Great! Your income has been recorded. 🎉"""
         total = sum(c['total'] for c in breakdown)
         
         # Build spending breakdown
-        spending_lines = []
-        for c in breakdown[:5]:  # Top 5 categories
-            percentage = (c['total'] / total * 100) if total > 0 else 0
-            spending_lines.append(f"  {c['icon']} {c['name']}: ₹{c['total']:,.2f} ({percentage:.1f}%)")
+        spending_lines = '\n'.join(
+            f"  {c['icon']} {c['name']}: ₹{c['total']:,.2f} ({c['total'] / total * 100 if total > 0 else 0:.1f}%)"
+            for c in breakdown[:5]  # Top 5 categories
+        )
         
         response = f"""📊 **Your Spending This Month**
 
 💸 **Total Spent:** ₹{total:,.2f}
 
 **Top Categories:**
-{chr(10).join(spending_lines)}
+{spending_lines}
 
-{'💡 Tip: Your biggest expense is ' + breakdown[0]['name'] + '. Consider if you can reduce spending there!' if breakdown else ''}"""
+💡 Tip: Your biggest expense is {breakdown[0]['name']}. Consider if you can reduce spending there!"""
         
         return {
             'response': response,
@@ -469,15 +839,16 @@ Great! Your income has been recorded. 🎉"""
                 'data': None
             }
         
-        tx_lines = []
-        for t in transactions:
-            prefix = "💸" if t['transaction_type'] == 'expense' else "💵"
-            sign = "-" if t['transaction_type'] == 'expense' else "+"
-            tx_lines.append(f"  {prefix} {t.get('description', 'No description')}: {sign}₹{t['amount']:,.2f}")
+        tx_lines = '\n'.join(
+            f"  💸 {t.get('description', 'No description')}: -₹{t['amount']:,.2f}"
+            if t['transaction_type'] == 'expense' else
+            f"  💵 {t.get('description', 'No description')}: +₹{t['amount']:,.2f}"
+            for t in transactions
+        )
         
         response = f"""📋 **Your Recent Transactions**
 
-{chr(10).join(tx_lines)}
+{tx_lines}
 
 Would you like to add a new transaction or see your balance?"""
         
@@ -499,14 +870,14 @@ Would you like to add a new transaction or see your balance?"""
                 'data': None
             }
         
-        # Find the category
-        categories = self.db.get_categories('expense', user_id=user_id)
-        category = None
-        
-        for c in categories:
-            if category_name.lower() in c['name'].lower():
-                category = c
-                break
+        # Find the category: exact name first, else the first partial match
+        index = self.db.get_category_index(user_id=user_id)
+        name_lower = category_name.lower()
+        category = index.by_lower_name.get(name_lower)
+        if not category or category['type'] != 'expense':
+            category = next(
+                (c for c in index.by_type.get('expense', []) if name_lower in c['name'].lower()), None
+            )
         
         if not category:
             return {
@@ -564,29 +935,18 @@ Just type naturally, and I'll understand! 🎯"""
     
     def _get_fallback_response(self, message: str) -> Dict:
         """Return fallback response when intent is not understood."""
-        suggestions = [
-            "Try saying 'Spent ₹500 on groceries'",
-            "Try 'What's my balance?'",
-            "Try 'Show my recent expenses'",
-        ]
-        
-        response = f"""🤔 I'm not sure I understood that correctly.
-
-{random.choice(suggestions)}
-
-Type **'help'** to see all the things I can do! 💡"""
-        
         return {
-            'response': response,
+            'response': random.choice(self.FALLBACK_RESPONSES),
             'action': 'fallback',
             'data': None
         }
     
     def get_quick_insights(self, user_id: int) -> str:
         """Get quick insights for proactive assistance."""
-        current_month = date.today().replace(day=1)
-        summary = self.db.get_summary(user_id=user_id, start_date=current_month)
-        breakdown = self.db.get_category_breakdown(user_id=user_id, start_date=current_month)
+        current_month = self._today().replace(day=1)
+        dashboard = self.db.get_dashboard(user_id=user_id, start_date=current_month)
+        summary = dashboard['summary']
+        breakdown = dashboard['breakdown']
         
         insights = []
         
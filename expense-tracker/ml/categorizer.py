@@ -4,13 +4,44 @@ Uses text classification to automatically categorize transactions
 """
 
 import re
-from typing import Optional, Tuple, List
+from typing import Optional, Tuple, List, Dict
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-import pickle
+import joblib
 import os
+import threading
+from collections import OrderedDict
+
+# Numba compiles the per-description scoring loop when installed
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+# Same token pattern as TfidfVectorizer's default
+_TOKEN_RE = re.compile(r'(?u)\b\w\w+\b')
+
+# Runs of anything but lowercase letters and digits, collapsed to one space
+_CLEAN_RE = re.compile(r'[^a-z0-9]+')
+
+
+if njit is not None:
+    @njit(cache=True)
+    def _score(weights, log_prior, indices, values):
+        """Joint log-likelihood log_prior + weights[:, indices] @ values."""
+        # A description hits only a handful of features, so a plain loop
+        # beats gathering columns and calling into BLAS
+        scores = log_prior.copy()
+        for c in range(weights.shape[0]):
+            total = 0.0
+            for k in range(indices.shape[0]):
+                total += weights[c, indices[k]] * values[k]
+            scores[c] += total
+        return scores
+else:
+    def _score(weights, log_prior, indices, values):
+        """Joint log-likelihood log_prior + weights[:, indices] @ values."""
+        return log_prior + weights[:, indices] @ values
 
 
 class ExpenseCategorizer:
@@ -87,6 +118,9 @@ class ExpenseCategorizer:
         ]
     }
     
+    # Cleaned descriptions remembered by the prediction LRU
+    PREDICTION_CACHE_SIZE = 4096
+    
     def __init__(self, model_path: str = None):
         """Initialize the categorizer with optional pre-trained model."""
         if model_path is None:
@@ -98,12 +132,24 @@ class ExpenseCategorizer:
         self.model_path = model_path
         self.model = None
         self.categories = list(self.TRAINING_DATA.keys())
+        self._build_keyword_index()
+        
+        # Descriptions repeat a lot ("Uber ride", "Netflix"), so results are
+        # kept in an LRU keyed by cleaned text and dropped whenever we refit
+        self._prediction_lock = threading.Lock()
+        self._prediction_cache: OrderedDict = OrderedDict()
         
         # Try to load existing model or train new one
         if os.path.exists(model_path):
             self._load_model()
         else:
             self._train_model()
+        
+        # Compile (or load the cached build of) the scoring kernel now rather
+        # than on the first prediction
+        if njit is not None and self.model:
+            _score(self.model['feature_log_prob'], self.model['class_log_prior'],
+                   np.zeros(1, dtype=np.intp), np.ones(1))
     
     def _prepare_training_data(self) -> Tuple[List[str], List[str]]:
         """Prepare training data from predefined examples."""
@@ -112,25 +158,31 @@ class ExpenseCategorizer:
         
         for category, keywords in self.TRAINING_DATA.items():
             for keyword in keywords:
-                # Add variations
+                # Add variations; no case variants, TF-IDF lowercases anyway
                 texts.extend([
                     keyword,
-                    keyword.upper(),
-                    keyword.capitalize(),
                     f"paid for {keyword}",
                     f"{keyword} payment",
                     f"{keyword} expense",
                 ])
-                labels.extend([category] * 6)
+                labels.extend([category] * 4)
         
         return texts, labels
     
     def _train_model(self):
         """Train the categorization model."""
         texts, labels = self._prepare_training_data()
+        self._fit(texts, labels)
+    
+    def _fit(self, texts: List[str], labels: List[str]):
+        """Fit TF-IDF + Naive Bayes and keep only the arrays inference needs."""
+        # sklearn is only needed to fit; loading and predicting use plain arrays
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
         
         # Create pipeline with TF-IDF and Naive Bayes
-        self.model = Pipeline([
+        pipeline = Pipeline([
             ('tfidf', TfidfVectorizer(
                 lowercase=True,
                 ngram_range=(1, 2),
@@ -140,19 +192,50 @@ class ExpenseCategorizer:
             ('classifier', MultinomialNB(alpha=0.1))
         ])
         
-        self.model.fit(texts, labels)
+        pipeline.fit(texts, labels)
+        self.model = self._extract_weights(pipeline)
         self._save_model()
+        self._invalidate_prediction_cache()
+    
+    @staticmethod
+    def _extract_weights(pipeline) -> Dict:
+        """Pull vocabulary, idf and Naive Bayes log-probabilities out of a fitted pipeline."""
+        vectorizer = pipeline.named_steps['tfidf']
+        classifier = pipeline.named_steps['classifier']
+        # float32 halves the model and the columns each prediction gathers;
+        # the precision lost never changes which class wins in practice
+        return {
+            'vocabulary': dict(vectorizer.vocabulary_),
+            'stop_words': frozenset(vectorizer.get_stop_words() or ()),
+            'idf': vectorizer.idf_.astype(np.float32),
+            'feature_log_prob': classifier.feature_log_prob_.astype(np.float32),
+            'class_log_prior': classifier.class_log_prior_.astype(np.float32),
+            'classes': classifier.classes_,
+            # Naive Bayes sufficient statistics, so retrain can update in place
+            'feature_count': classifier.feature_count_,
+            'class_count': classifier.class_count_,
+            'alpha': classifier.alpha,
+        }
     
     def _save_model(self):
         """Save the trained model to disk."""
-        with open(self.model_path, 'wb') as f:
-            pickle.dump(self.model, f)
+        # Uncompressed so the arrays can be memory-mapped on load. Write
+        # beside the target and swap it in, so processes still mapping the
+        # old file keep a valid inode
+        tmp_path = f'{self.model_path}.tmp'
+        joblib.dump(self.model, tmp_path)
+        os.replace(tmp_path, self.model_path)
     
     def _load_model(self):
         """Load a pre-trained model from disk."""
         try:
-            with open(self.model_path, 'rb') as f:
-                self.model = pickle.load(f)
+            # Arrays are mapped read-only rather than copied into each process;
+            # plain pickles from older versions still load, just without mmap
+            self.model = joblib.load(self.model_path, mmap_mode='r')
+            # Models saved before the weights-only format are whole pipelines
+            if hasattr(self.model, 'named_steps'):
+                self.model = self._extract_weights(self.model)
+                self._save_model()
         except Exception:
             self._train_model()
     
@@ -163,50 +246,160 @@ class ExpenseCategorizer:
         Returns:
             Tuple of (category_name, confidence_score)
         """
-        if not description or not description.strip():
-            return 'Other', 0.0
+        return self.predict_many([description])[0]
+    
+    def predict_many(self, descriptions: List[str]) -> List[Tuple[str, float]]:
+        """
+        Predict categories for many transaction descriptions at once.
         
-        # Clean the description
-        cleaned = self._clean_text(description)
+        Descriptions that miss both the keyword table and the prediction cache
+        go through the model in a single predict_proba call.
         
-        # First, try keyword matching for high confidence
-        keyword_match = self._keyword_match(cleaned)
-        if keyword_match:
-            return keyword_match, 0.95
+        Returns:
+            List of (category_name, confidence_score), one per description
+        """
+        results = [('Other', 0.0)] * len(descriptions)
+        pending = []
+        cleaned_pending = []
         
-        # Use ML model for prediction
-        if self.model:
+        for i, description in enumerate(descriptions):
+            if not description or not description.strip():
+                continue
+            
+            # First, try keyword matching for high confidence; it runs on
+            # the lowercased text, so a hit never pays for cleaning
+            text_lower = description.lower()
+            keyword_match = self._keyword_match(text_lower)
+            if keyword_match:
+                results[i] = (keyword_match, 0.95)
+                continue
+            
+            # Clean the description (same as _clean_text, already lowercased)
+            cleaned = _CLEAN_RE.sub(' ', text_lower).strip()
+            
+            cached = self._get_cached_prediction(cleaned)
+            if cached:
+                results[i] = cached
+            else:
+                pending.append(i)
+                cleaned_pending.append(cleaned)
+        
+        # Use ML model for the rest, deriving labels from the probabilities
+        if pending and self.model:
             try:
-                prediction = self.model.predict([cleaned])[0]
-                probabilities = self.model.predict_proba([cleaned])[0]
-                confidence = max(probabilities)
+                probabilities = self._predict_proba(cleaned_pending)
+                best = probabilities.argmax(axis=1)
+                labels = self.model['classes'][best]
+                confidences = probabilities[np.arange(len(best)), best]
                 
-                return prediction, confidence
+                for i, cleaned, label, confidence in zip(pending, cleaned_pending, labels, confidences):
+                    results[i] = (label, confidence)
+                    self._cache_prediction(cleaned, results[i])
             except Exception:
                 pass
         
-        return 'Other', 0.0
+        return results
+    
+    def _get_cached_prediction(self, cleaned: str) -> Optional[Tuple[str, float]]:
+        """Return a cached prediction for cleaned text, refreshing its recency."""
+        with self._prediction_lock:
+            result = self._prediction_cache.get(cleaned)
+            if result is not None:
+                self._prediction_cache.move_to_end(cleaned)
+            return result
+    
+    def _cache_prediction(self, cleaned: str, result: Tuple[str, float]):
+        """Remember a prediction, evicting the least recently used entry."""
+        with self._prediction_lock:
+            self._prediction_cache[cleaned] = result
+            if len(self._prediction_cache) > self.PREDICTION_CACHE_SIZE:
+                self._prediction_cache.popitem(last=False)
+    
+    def _invalidate_prediction_cache(self):
+        """Drop cached predictions after the model changes."""
+        with self._prediction_lock:
+            self._prediction_cache.clear()
+    
+    def _predict_proba(self, texts: List[str]) -> np.ndarray:
+        """
+        Naive Bayes class probabilities for cleaned texts.
+        
+        Mirrors TfidfVectorizer.transform + MultinomialNB.predict_proba, but
+        gathers only the few weight columns each description actually hits.
+        """
+        weights = self.model['feature_log_prob']
+        log_prior = self.model['class_log_prior']
+        
+        probabilities = np.empty((len(texts), len(log_prior)))
+        for row, text in enumerate(texts):
+            indices, values = self._vectorize(text)
+            
+            scores = log_prior
+            if len(indices):
+                scores = _score(weights, log_prior, indices, values)
+            
+            # Normalise the joint log-likelihoods, as predict_proba does
+            scores = np.exp(scores - scores.max())
+            probabilities[row] = scores / scores.sum()
+        
+        return probabilities
+    
+    def _grams(self, text: str) -> List[str]:
+        """Unigrams and bigrams of text after stop words, as the vectorizer builds them."""
+        stop_words = self.model['stop_words']
+        tokens = [t for t in _TOKEN_RE.findall(text.lower()) if t not in stop_words]
+        return tokens + [' '.join(pair) for pair in zip(tokens, tokens[1:])]
+    
+    def _vectorize(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """L2-normalised TF-IDF of text as (feature indices, values)."""
+        vocabulary = self.model['vocabulary']
+        counts = {}
+        for gram in self._grams(text):
+            index = vocabulary.get(gram)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        
+        indices = np.fromiter(counts.keys(), dtype=np.intp, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        if counts:
+            values *= self.model['idf'][indices]
+            values /= np.sqrt(values @ values)
+        return indices, values
     
     def _clean_text(self, text: str) -> str:
         """Clean and normalize text for processing."""
-        # Convert to lowercase
-        text = text.lower()
-        # Remove special characters but keep spaces
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        return text
+        # Lowercase, then turn each run of special characters or whitespace
+        # into a single space in one pass
+        return _CLEAN_RE.sub(' ', text.lower()).strip()
     
-    def _keyword_match(self, text: str) -> Optional[str]:
-        """Try to match based on keywords for high-confidence predictions."""
-        text_lower = text.lower()
-        
+    def _build_keyword_index(self):
+        """Compile all training keywords into one lookahead regex."""
+        self._kw_to_cat = {}
         for category, keywords in self.TRAINING_DATA.items():
             for keyword in keywords:
-                if keyword.lower() in text_lower:
-                    return category
+                # Shared keywords keep their first category
+                self._kw_to_cat.setdefault(keyword, category)
+        
+        # Longest keyword wins ("birthday money" over "gift"), ties going to
+        # the earlier category; sorted() is stable, so dict order breaks them
+        self._kw_sorted = sorted(self._kw_to_cat, key=len, reverse=True)
+        self._kw_categories = [self._kw_to_cat[kw] for kw in self._kw_sorted]
         
-        return None
+        # Each keyword gets its own group, in priority order, so
+        # match.lastindex is its rank. Words are joined by any run of
+        # non-alphanumerics, which lets the pattern run on raw lowercase text
+        # and still match what _clean_text produces. The zero-width lookahead
+        # reports the best keyword at every position in a single scan.
+        alternation = '|'.join(
+            '(' + '[^a-z0-9]+'.join(re.escape(word) for word in kw.split()) + ')'
+            for kw in self._kw_sorted
+        )
+        self._kw_regex = re.compile(f'(?=(?:{alternation}))')
+    
+    def _keyword_match(self, text_lower: str) -> Optional[str]:
+        """Try to match based on keywords for high-confidence predictions; text must be lowercase."""
+        best_rank = min((match.lastindex for match in self._kw_regex.finditer(text_lower)), default=None)
+        return self._kw_categories[best_rank - 1] if best_rank else None
     
     def get_top_predictions(self, description: str, top_n: int = 3) -> List[Tuple[str, float]]:
         """
@@ -222,8 +415,8 @@ class ExpenseCategorizer:
         
         if self.model:
             try:
-                probabilities = self.model.predict_proba([cleaned])[0]
-                classes = self.model.classes_
+                probabilities = self._predict_proba([cleaned])[0]
+                classes = self.model['classes']
                 
                 # Sort by probability
                 sorted_indices = np.argsort(probabilities)[::-1][:top_n]
@@ -238,9 +431,18 @@ class ExpenseCategorizer:
         """
         Retrain the model, optionally with additional labeled data.
         
+        When every description only uses known terms and categories, the
+        current model is updated in place (as MultinomialNB.partial_fit would)
+        without refitting the vocabulary; otherwise it is rebuilt from the
+        predefined examples plus the additional data.
+        
         Args:
             additional_data: List of (description, category) tuples
         """
+        if additional_data and self._can_update(additional_data):
+            self._partial_fit(additional_data)
+            return
+        
         texts, labels = self._prepare_training_data()
         
         if additional_data:
@@ -248,15 +450,40 @@ class ExpenseCategorizer:
                 texts.append(desc)
                 labels.append(cat)
         
-        self.model = Pipeline([
-            ('tfidf', TfidfVectorizer(
-                lowercase=True,
-                ngram_range=(1, 2),
-                max_features=5000,
-                stop_words='english'
-            )),
-            ('classifier', MultinomialNB(alpha=0.1))
-        ])
+        self._fit(texts, labels)
+    
+    def _can_update(self, data: List[Tuple[str, str]]) -> bool:
+        """Whether data can be folded into the current model without a new vocabulary."""
+        if not self.model or 'feature_count' not in self.model:
+            return False
+        vocabulary = self.model['vocabulary']
+        classes = set(self.model['classes'])
+        return all(
+            cat in classes and all(gram in vocabulary for gram in self._grams(desc))
+            for desc, cat in data
+        )
+    
+    def _partial_fit(self, data: List[Tuple[str, str]]):
+        """Add labeled samples to the Naive Bayes counts and recompute its log-probabilities."""
+        class_index = {cat: i for i, cat in enumerate(self.model['classes'])}
+        # Copies, since a loaded model's arrays are read-only memory maps
+        feature_count = np.array(self.model['feature_count'])
+        class_count = np.array(self.model['class_count'])
+        
+        for desc, cat in data:
+            indices, values = self._vectorize(desc)
+            feature_count[class_index[cat], indices] += values
+            class_count[class_index[cat]] += 1
+        
+        smoothed = feature_count + self.model['alpha']
+        model = dict(self.model)
+        model['feature_count'] = feature_count
+        model['class_count'] = class_count
+        model['feature_log_prob'] = (
+            np.log(smoothed) - np.log(smoothed.sum(axis=1, keepdims=True))
+        ).astype(np.float32)
+        model['class_log_prior'] = (np.log(class_count) - np.log(class_count.sum())).astype(np.float32)
         
-        self.model.fit(texts, labels)
+        self.model = model
         self._save_model()
+        self._invalidate_prediction_cache()
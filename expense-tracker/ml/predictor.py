@@ -5,9 +5,8 @@ Provides AI-powered insights, predictions, and recommendations
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import List, Dict, Tuple, Optional
-from collections import defaultdict
 
 
 class ExpensePredictor:
@@ -19,12 +18,29 @@ class ExpensePredictor:
     def __init__(self, db_manager):
         """Initialize with database manager."""
         self.db = db_manager
+        # Latest forecast per user, keyed by (day, transactions version)
+        self._forecast_cache: Dict[int, Tuple[Tuple, Dict]] = {}
     
     def predict_next_month_expenses(self, user_id: int) -> Dict:
         """
         Predict next month's expenses based on historical data for a specific user.
         Uses weighted moving average with recent months having more weight.
+        
+        Recommendations, alerts and the dashboard all ask for this on the same
+        rerun, so the result is reused until the day or the transactions change.
         """
+        # The trend window is cut off by today's date, so key on the day
+        key = (date.today(), self.db.get_transactions_version())
+        cached = self._forecast_cache.get(user_id)
+        if cached is not None and cached[0] == key:
+            return dict(cached[1])
+        
+        forecast = self._forecast_next_month(user_id)
+        self._forecast_cache[user_id] = (key, forecast)
+        return dict(forecast)
+    
+    def _forecast_next_month(self, user_id: int) -> Dict:
+        """Compute the weighted-moving-average forecast for predict_next_month_expenses."""
         # Get monthly trends for the past 6 months
         df = self.db.get_monthly_trends(user_id=user_id, months=6)
         
@@ -37,28 +53,17 @@ class ExpensePredictor:
                 'message': 'Not enough historical data for accurate prediction. Add more transactions!'
             }
         
-        # Calculate weighted average (more recent = higher weight)
-        weights = np.array([1, 1.5, 2, 2.5, 3, 3.5])[:len(df)]
-        weights = weights / weights.sum()
+        # One (months, 2) matrix of expense and income, missing columns as 0
+        values = df.reindex(columns=['expense', 'income'], fill_value=0).fillna(0).to_numpy(dtype=np.float64)
         
-        # Predict expenses
-        if 'expense' in df.columns:
-            expenses = df['expense'].fillna(0).values
-            predicted_expense = np.average(expenses, weights=weights)
-        else:
-            predicted_expense = 0
-        
-        # Predict income
-        if 'income' in df.columns:
-            incomes = df['income'].fillna(0).values
-            predicted_income = np.average(incomes, weights=weights)
-        else:
-            predicted_income = 0
+        # Calculate weighted average (more recent = higher weight)
+        weights = np.arange(1.0, 1 + 0.5 * len(df), 0.5)[:len(df)]
+        predicted_expense, predicted_income = weights @ values / weights.sum()
         
         # Determine trend
         if len(df) >= 3:
-            recent_expenses = df['expense'].tail(3).mean() if 'expense' in df.columns else 0
-            older_expenses = df['expense'].head(3).mean() if 'expense' in df.columns else 0
+            recent_expenses = values[-3:, 0].mean()
+            older_expenses = values[:3, 0].mean()
             
             if recent_expenses > older_expenses * 1.1:
                 trend = 'increasing'
@@ -123,30 +128,31 @@ class ExpensePredictor:
                     'percentage': percentage
                 })
         
-        # Detect unusual spending spikes (compared to category average)
-        current_month = datetime.now().strftime('%Y-%m')
-        current_breakdown = self.db.get_category_breakdown(
-            user_id=user_id,
-            start_date=datetime.now().replace(day=1).date()
-        )
-        
-        # Get historical average for comparison
+        # Detect unusual spending spikes, compared to the historical average
         historical_df = self.db.get_monthly_trends(user_id=user_id, months=3)
         
         if not historical_df.empty and 'expense' in historical_df.columns:
-            avg_monthly_expense = historical_df['expense'].mean()
+            # Category > 50% of avg total
+            threshold = historical_df['expense'].mean() * 0.5
+            alerted = {a['category'] for a in alerts}
+            
+            # The breakdown is only needed once there is a history to compare to
+            current_breakdown = self.db.get_dashboard(
+                user_id=user_id,
+                start_date=datetime.now().replace(day=1).date()
+            )['breakdown']
             
             for cat in current_breakdown:
-                if cat['total'] > avg_monthly_expense * 0.5:  # Category > 50% of avg total
-                    if cat['name'] not in [a['category'] for a in alerts]:
-                        alerts.append({
-                            'category': cat['name'],
-                            'icon': cat['icon'],
-                            'type': 'high_spending',
-                            'severity': 'low',
-                            'message': f"High spending detected: ₹{cat['total']:,.0f} this month",
-                            'percentage': 0
-                        })
+                if cat['total'] > threshold and cat['name'] not in alerted:
+                    alerted.add(cat['name'])
+                    alerts.append({
+                        'category': cat['name'],
+                        'icon': cat['icon'],
+                        'type': 'high_spending',
+                        'severity': 'low',
+                        'message': f"High spending detected: ₹{cat['total']:,.0f} this month",
+                        'percentage': 0
+                    })
         
         return alerts
     
@@ -156,15 +162,11 @@ class ExpensePredictor:
         """
         recommendations = []
         
-        # Get current month summary
+        # Get current month summary and category breakdown in one query
         current_month_start = datetime.now().replace(day=1).date()
-        summary = self.db.get_summary(user_id=user_id, start_date=current_month_start)
-        
-        # Get category breakdown
-        breakdown = self.db.get_category_breakdown(user_id=user_id, start_date=current_month_start)
-        
-        # Get predictions
-        predictions = self.predict_next_month_expenses(user_id=user_id)
+        dashboard = self.db.get_dashboard(user_id=user_id, start_date=current_month_start)
+        summary = dashboard['summary']
+        breakdown = dashboard['breakdown']
         
         # Recommendation 1: Savings ratio
         if summary['income'] > 0:
@@ -187,6 +189,8 @@ class ExpensePredictor:
         
         # Recommendation 2: Top spending category
         if breakdown:
+            # Breakdown comes sorted by total, so the top category is the first
+            # row and the sum is the only pass over it
             top_category = breakdown[0]
             total_expense = sum(c['total'] for c in breakdown)
             
@@ -211,7 +215,9 @@ class ExpensePredictor:
                 'priority': 'medium'
             })
         
-        # Recommendation 4: Spending trend
+        # Recommendation 4: Spending trend (the forecast is cached per day and
+        # data version, so this reuses the one the insights page just showed)
+        predictions = self.predict_next_month_expenses(user_id=user_id)
         if predictions['trend'] == 'increasing':
             recommendations.append({
                 'icon': '📈',
@@ -235,10 +241,12 @@ class ExpensePredictor:
         """
         Generate comprehensive spending insights.
         """
-        # Current month data
-        current_month_start = datetime.now().replace(day=1).date()
-        current_summary = self.db.get_summary(user_id=user_id, start_date=current_month_start)
-        current_breakdown = self.db.get_category_breakdown(user_id=user_id, start_date=current_month_start)
+        # Current month data, summary and breakdown in one query
+        today = date.today()
+        current_month_start = today.replace(day=1)
+        dashboard = self.db.get_dashboard(user_id=user_id, start_date=current_month_start)
+        current_summary = dashboard['summary']
+        current_breakdown = dashboard['breakdown']
         
         # Previous month data
         prev_month_end = current_month_start - timedelta(days=1)
@@ -257,9 +265,8 @@ class ExpensePredictor:
             income_change = ((current_summary['income'] - prev_summary['income']) / 
                            prev_summary['income']) * 100
         
-        # Daily average
-        days_passed = datetime.now().day
-        daily_avg = current_summary['expense'] / days_passed if days_passed > 0 else 0
+        # Daily average over the days elapsed this month
+        daily_avg = current_summary['expense'] / today.day
         
         # Most frequent category
         most_frequent = None
@@ -290,26 +297,25 @@ class ExpensePredictor:
             'total_categories_used': len(current_breakdown)
         }
     
+    def get_all_insights(self, user_id: int) -> Dict:
+        """
+        Compute everything the insights page shows in one call.
+        
+        The forecast goes first so the recommendations reuse it, and the
+        alerts and spending insights share the cached current-month dashboard.
+        
+        Returns:
+            Dict with keys: predictions, recommendations, alerts, insights
+        """
+        return {
+            'predictions': self.predict_next_month_expenses(user_id=user_id),
+            'recommendations': self.get_recommendations(user_id=user_id),
+            'alerts': self.detect_overspending(user_id=user_id),
+            'insights': self.get_spending_insights(user_id=user_id)
+        }
+    
     def get_category_trends(self, user_id: int, category_id: int, months: int = 6) -> pd.DataFrame:
         """
         Get spending trend for a specific category over time.
         """
-        cursor = self.db.conn.cursor()
-        
-        cursor.execute('''
-            SELECT 
-                strftime('%Y-%m', date) as month,
-                SUM(amount) as total
-            FROM transactions
-            WHERE category_id = ? AND user_id = ?
-            AND date >= date('now', ?)
-            GROUP BY month
-            ORDER BY month
-        ''', (category_id, user_id, f'-{months} months'))
-        
-        results = cursor.fetchall()
-        
-        if not results:
-            return pd.DataFrame(columns=['month', 'total'])
-        
-        return pd.DataFrame([dict(row) for row in results])
+        return self.db.get_category_monthly_totals(user_id=user_id, category_id=category_id, months=months)
@@ -5,21 +5,19 @@ Main Streamlit Application
 
 import streamlit as st
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from datetime import datetime, date, timedelta
+from datetime import date
+import io
 import sys
 import os
+import time
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from database.db_manager import DatabaseManager
-from ml.categorizer import ExpenseCategorizer
-from ml.predictor import ExpensePredictor
-from ml.assistant import AIAssistant
 from utils.helpers import (
-    format_currency, format_currency_compact, get_greeting,
+    format_currency, format_currency_compact, format_currency_series, get_greeting,
     get_date_range, format_date_friendly, days_remaining_in_month,
     generate_color_palette
 )
@@ -32,252 +30,18 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# Static charts: no mode bar to initialise on each redraw
+PLOTLY_CONFIG = {'displayModeBar': False}
+
 # ==================== Custom CSS ====================
-st.markdown("""
-<style>
-    /* Main theme colors */
-    :root {
-        --primary-color: #667eea;
-        --secondary-color: #764ba2;
-        --success-color: #10B981;
-        --warning-color: #F59E0B;
-        --danger-color: #EF4444;
-        --background-dark: #1a1a2e;
-        --card-background: #16213e;
-    }
-    
-    /* Hide Streamlit branding */
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    
-    /* Gradient header */
-    .main-header {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        padding: 2rem;
-        border-radius: 16px;
-        margin-bottom: 2rem;
-        color: white;
-        text-align: center;
-    }
-    
-    .main-header h1 {
-        margin: 0;
-        font-size: 2.5rem;
-        font-weight: 700;
-    }
-    
-    .main-header p {
-        margin: 0.5rem 0 0 0;
-        opacity: 0.9;
-        font-size: 1.1rem;
-    }
-    
-    /* Metric cards */
-    .metric-card {
-        background: linear-gradient(135deg, #1e3a5f 0%, #0d1b2a 100%);
-        padding: 1.5rem;
-        border-radius: 16px;
-        border: 1px solid rgba(255,255,255,0.1);
-        margin-bottom: 1rem;
-    }
-    
-    .metric-card h3 {
-        color: #94a3b8;
-        font-size: 0.9rem;
-        margin: 0;
-        font-weight: 500;
-    }
-    
-    .metric-card .value {
-        color: white;
-        font-size: 2rem;
-        font-weight: 700;
-        margin: 0.5rem 0;
-    }
-    
-    .metric-card .change {
-        font-size: 0.85rem;
-    }
-    
-    .change.positive { color: #10B981; }
-    .change.negative { color: #EF4444; }
-    
-    /* Transaction list */
-    .transaction-item {
-        background: rgba(255,255,255,0.05);
-        padding: 1rem;
-        border-radius: 12px;
-        margin-bottom: 0.75rem;
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        border: 1px solid rgba(255,255,255,0.08);
-        transition: all 0.2s ease;
-    }
-    
-    .transaction-item:hover {
-        background: rgba(255,255,255,0.08);
-        border-color: rgba(255,255,255,0.15);
-    }
-    
-    .transaction-icon {
-        font-size: 1.5rem;
-        margin-right: 1rem;
-    }
-    
-    .transaction-details {
-        flex: 1;
-    }
-    
-    .transaction-description {
-        color: white;
-        font-weight: 500;
-    }
-    
-    .transaction-category {
-        color: #94a3b8;
-        font-size: 0.85rem;
-    }
-    
-    .transaction-amount {
-        font-weight: 600;
-        font-size: 1.1rem;
-    }
-    
-    .amount-expense { color: #EF4444; }
-    .amount-income { color: #10B981; }
-    
-    /* Alert cards */
-    .alert-card {
-        padding: 1rem;
-        border-radius: 12px;
-        margin-bottom: 0.75rem;
-        display: flex;
-        align-items: center;
-        gap: 1rem;
-    }
-    
-    .alert-high {
-        background: rgba(239, 68, 68, 0.15);
-        border: 1px solid rgba(239, 68, 68, 0.3);
-    }
-    
-    .alert-medium {
-        background: rgba(245, 158, 11, 0.15);
-        border: 1px solid rgba(245, 158, 11, 0.3);
-    }
-    
-    .alert-low {
-        background: rgba(16, 185, 129, 0.15);
-        border: 1px solid rgba(16, 185, 129, 0.3);
-    }
-    
-    /* Recommendation cards */
-    .recommendation-card {
-        background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
-        padding: 1.25rem;
-        border-radius: 12px;
-        margin-bottom: 0.75rem;
-        border: 1px solid rgba(102, 126, 234, 0.2);
-    }
-    
-    .recommendation-title {
-        color: white;
-        font-weight: 600;
-        margin-bottom: 0.5rem;
-    }
-    
-    .recommendation-text {
-        color: #94a3b8;
-        font-size: 0.9rem;
-    }
-    
-    /* Progress bars */
-    .budget-progress {
-        background: rgba(255,255,255,0.1);
-        border-radius: 10px;
-        height: 10px;
-        overflow: hidden;
-        margin: 0.5rem 0;
-    }
-    
-    .budget-progress-fill {
-        height: 100%;
-        border-radius: 10px;
-        transition: width 0.5s ease;
-    }
-    
-    /* Sidebar styling */
-    .css-1d391kg {
-        background: linear-gradient(180deg, #1a1a2e 0%, #16213e 100%);
-    }
-    
-    /* Button styling */
-    .stButton>button {
-        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-        color: white;
-        border: none;
-        padding: 0.75rem 2rem;
-        border-radius: 10px;
-        font-weight: 600;
-        transition: all 0.3s ease;
-    }
-    
-    .stButton>button:hover {
-        transform: translateY(-2px);
-        box-shadow: 0 10px 20px rgba(102, 126, 234, 0.3);
-    }
-    
-    /* Input styling */
-    .stTextInput>div>div>input,
-    .stNumberInput>div>div>input,
-    .stSelectbox>div>div>select,
-    .stDateInput>div>div>input {
-        background: rgba(255,255,255,0.05);
-        border: 1px solid rgba(255,255,255,0.1);
-        border-radius: 10px;
-        color: white;
-    }
-    
-    /* Tab styling */
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 2rem;
-        background: transparent;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        background: transparent;
-        color: #94a3b8;
-        font-weight: 500;
-        padding: 1rem 0;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        color: white;
-        border-bottom: 2px solid #667eea;
-    }
-    
-    /* Chart container */
-    .chart-container {
-        background: rgba(255,255,255,0.03);
-        padding: 1.5rem;
-        border-radius: 16px;
-        border: 1px solid rgba(255,255,255,0.08);
-    }
-    
-    /* Empty state */
-    .empty-state {
-        text-align: center;
-        padding: 3rem;
-        color: #94a3b8;
-    }
-    
-    .empty-state-icon {
-        font-size: 4rem;
-        margin-bottom: 1rem;
-    }
-</style>
-""", unsafe_allow_html=True)
+@st.cache_data(show_spinner=False)
+def load_css() -> str:
+    """Read the app stylesheet once; every rerun re-emits the cached string."""
+    css_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'assets', 'style.css')
+    with open(css_path, encoding='utf-8') as f:
+        return f"<style>\n{f.read()}</style>"
+
+st.markdown(load_css(), unsafe_allow_html=True)
 
 
 # ==================== Initialize Session State ====================
@@ -286,11 +50,40 @@ def get_database():
     """Get or create database connection."""
     return DatabaseManager()
 
+# The ML modules are imported on first use: the login, history, budgets and
+# settings pages never need them, and the assistant pulls in the Gemini SDK.
 @st.cache_resource
 def get_categorizer():
     """Get or create ML categorizer."""
+    from ml.categorizer import ExpenseCategorizer
     return ExpenseCategorizer()
 
+@st.cache_resource
+def get_predictor():
+    """Get or create the spending predictor."""
+    from ml.predictor import ExpensePredictor
+    return ExpensePredictor(get_database())
+
+def create_assistant():
+    """
+    Create a chat assistant; it holds per-request state, so it can't be shared.
+    
+    The db, categorizer and Gemini models it uses are already shared process
+    wide; the instance itself (intent patterns and lookups) is only built
+    when a message is actually sent.
+    """
+    from ml.assistant import AIAssistant
+    return AIAssistant(get_database(), get_categorizer())
+
+# After a failed login, a client's next password is not hashed until this
+# many seconds have passed, so guessing can't keep the server hashing
+LOGIN_RETRY_DELAY = 1.0
+
+@st.cache_resource
+def get_login_failures():
+    """Last failed login time (monotonic) per client, shared by all sessions."""
+    return {}
+
 def init_session_state():
     """Initialize session state variables."""
     if 'selected_page' not in st.session_state:
@@ -311,10 +104,188 @@ def init_session_state():
         st.session_state.auth_mode = 'login'
 
 init_session_state()
+# Fixed once per run so widgets and cache keys agree even across midnight
+TODAY = date.today()
+MONTH_START = TODAY.replace(day=1)
 db = get_database()
-categorizer = get_categorizer()
-predictor = ExpensePredictor(db)
-assistant = AIAssistant(db, categorizer)
+
+# ==================== Cached Queries ====================
+# Every widget interaction reruns the script, so dashboard reads go through
+# these wrappers. The transactions version is part of each key, which makes
+# any write (form, history, assistant or another session) miss the cache.
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_summary(user_id: int, start_date: date, version: tuple):
+    """
+    Cached period summary.
+    
+    Taken from db.get_dashboard rather than db.get_summary: its one scan is
+    kept in the manager's dashboard cache, where the predictor's current-month
+    insights and alerts pick it up instead of scanning again.
+    """
+    return db.get_dashboard(user_id=user_id, start_date=start_date)['summary']
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_category_breakdown(user_id: int, start_date: date, version: tuple):
+    """Cached db.get_category_breakdown_arrays."""
+    return db.get_category_breakdown_arrays(user_id=user_id, start_date=start_date)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_monthly_trends(user_id: int, months: int, version: tuple):
+    """Cached db.get_monthly_trends."""
+    return db.get_monthly_trends(user_id=user_id, months=months)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_recent_transactions(user_id: int, limit: int, version: tuple):
+    """Cached db.get_transactions for the latest transactions."""
+    return db.get_transactions(user_id=user_id, limit=limit)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_transactions(user_id: int, start_date: date, end_date: date, transaction_type: str,
+                        category_id: int, search: str, version: tuple):
+    """Cached db.get_transactions for the history filters."""
+    return db.get_transactions(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        transaction_type=transaction_type,
+        category_id=category_id,
+        search=search
+    )
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_budget_status(user_id: int, today: date, version: tuple):
+    """Cached db.get_budget_status for the current month."""
+    return db.get_budget_status(user_id=user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_spending_insights(user_id: int, today: date, version: tuple):
+    """Cached predictor.get_spending_insights."""
+    return get_predictor().get_spending_insights(user_id=user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_overspending(user_id: int, today: date, version: tuple):
+    """Cached predictor.detect_overspending."""
+    return get_predictor().detect_overspending(user_id=user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_all_insights(user_id: int, today: date, version: tuple):
+    """Cached predictor.get_all_insights, everything the insights page shows."""
+    return get_predictor().get_all_insights(user_id=user_id)
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_quick_insights(user_id: int, today: date, version: tuple):
+    """Cached assistant.get_quick_insights; the assistant is only built on a miss."""
+    return create_assistant().get_quick_insights(user_id=user_id)
+
+# Read-only, so their replies depend only on the user's data. A Gemini key
+# added in settings is not part of the key, hence the shorter ttl.
+@st.cache_data(ttl=30, show_spinner=False)
+def cached_quick_action_reply(user_id: int, message: str, today: date, version: tuple):
+    """Cached assistant reply to a read-only quick action (balance, spending, recent)."""
+    return create_assistant().process_message(message, user_id=user_id)['response']
+
+
+def category_options(user_id: int, category_type: str = None):
+    """
+    Map "<icon> <name>" labels to ids, read from the cached category index.
+    
+    A name with both a user and a global copy is listed once, under the
+    user's id: the first in index order, the one by_lower_name (and so the
+    assistant) resolves it to.
+    """
+    index = db.get_category_index(user_id)
+    categories = index.by_type.get(category_type, []) if category_type else index.by_id.values()
+    first = {}
+    for c in categories:
+        first.setdefault((c['name'].lower(), c['type']), c)
+    return {f"{c['icon']} {c['name']}": c['id'] for c in first.values()}
+
+
+# ==================== HTML Templates ====================
+# Lists are rendered as one joined st.markdown call rather than one per row.
+# Items must not contain blank lines, which would end the markdown HTML block.
+TRANSACTION_ITEM_HTML = """<div class="transaction-item">
+    <span class="transaction-icon">{icon}</span>
+    <div class="transaction-details">
+        <div class="transaction-description">{description}</div>
+        <div class="transaction-category">{category} • {date}</div>
+    </div>
+    <div class="transaction-amount {amount_class}">
+        {prefix}{amount}
+    </div>
+</div>"""
+
+ALERT_CARD_HTML = """<div class="alert-card alert-{severity}">
+    <span style="font-size: 1.5rem;">{icon}</span>
+    <div>
+        <strong>{category}</strong><br>
+        <span style="font-size: 0.85rem; color: #94a3b8;">{message}</span>
+    </div>
+</div>"""
+
+RECOMMENDATION_CARD_HTML = """<div class="recommendation-card">
+    <div class="recommendation-title">
+        <span style="color: {priority_color};">●</span> {icon} {title}
+    </div>
+    <div class="recommendation-text">{description}</div>
+</div>"""
+
+PRIORITY_COLORS = {'high': '#EF4444', 'medium': '#F59E0B', 'low': '#10B981'}
+
+METRIC_CARD_HTML = """<div class="metric-card">
+    <h3>{title}</h3>
+    <div class="value"{value_style}>{value}</div>
+    <div class="change{change_class}">{change}</div>
+</div>"""
+
+BUDGET_ROW_HTML = """<div style="background: rgba(255,255,255,0.05); padding: 1rem; border-radius: 12px; margin-bottom: 1rem;">
+    <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
+        <span style="font-size: 1.1rem;">
+            <strong>{icon} {name}</strong>
+        </span>
+        <span style="color: #94a3b8;">{status_text}</span>
+    </div>
+    <div class="budget-progress">
+        <div class="budget-progress-fill" style="width: {percentage}%; background: {bar_color};"></div>
+    </div>
+    <div style="display: flex; justify-content: space-between; margin-top: 0.5rem; color: #94a3b8; font-size: 0.85rem;">
+        <span>Spent: {spent}</span>
+        <span>Limit: {limit}</span>
+        <span style="color: {remaining_color};">
+            {remaining_text}
+        </span>
+    </div>
+</div>"""
+
+
+def metric_card(title, value, change, color=None, change_class=None):
+    """One metric card's HTML; color overrides the value's text color."""
+    return METRIC_CARD_HTML.format(
+        title=title,
+        value=value,
+        change=change,
+        value_style=f' style="color: {color};"' if color else '',
+        change_class=f' {change_class}' if change_class else ''
+    )
+
+
+def render_metric_grid(*cards):
+    """Render metric cards as one row laid out by the metrics-grid CSS grid."""
+    st.markdown(f'<div class="metrics-grid">{"".join(cards)}</div>', unsafe_allow_html=True)
+
+
+def render_alert_cards(alerts):
+    """Render overspending alerts as a single markdown block."""
+    st.markdown("".join(
+        ALERT_CARD_HTML.format(
+            severity=alert['severity'],
+            icon=alert['icon'],
+            category=alert['category'],
+            message=alert['message']
+        )
+        for alert in alerts
+    ), unsafe_allow_html=True)
+
 
 # ==================== Authentication UI ====================
 def render_auth():
@@ -344,15 +315,27 @@ def render_auth():
                 submitted = st.form_submit_button("Login", use_container_width=True)
                 
                 if submitted:
-                    user = db.authenticate_user(username, password)
-                    if user:
-                        st.session_state.logged_in = True
-                        st.session_state.user_id = user['id']
-                        st.session_state.user_data = user
-                        st.success(f"Welcome back, {user['full_name']}!")
-                        st.rerun()
+                    failures = get_login_failures()
+                    client = getattr(st.context, 'ip_address', None) or username.lower()
+                    now = time.monotonic()
+                    if now - failures.get(client, float('-inf')) < LOGIN_RETRY_DELAY:
+                        st.error("Too many attempts. Please wait a moment and try again.")
                     else:
-                        st.error("Invalid username or password")
+                        user = db.authenticate_user(username, password)
+                        if user:
+                            failures.pop(client, None)
+                            st.session_state.logged_in = True
+                            st.session_state.user_id = user['id']
+                            st.session_state.user_data = user
+                            st.success(f"Welcome back, {user['full_name']}!")
+                            st.rerun()
+                        else:
+                            # Expired entries only matter while they block; prune as the map grows
+                            if len(failures) > 1024:
+                                for key in [k for k, t in failures.items() if now - t >= LOGIN_RETRY_DELAY]:
+                                    failures.pop(key, None)
+                            failures[client] = now
+                            st.error("Invalid username or password")
         
         with tab2:
             with st.form("signup_form"):
@@ -419,7 +402,7 @@ with st.sidebar:
         st.markdown("---")
         
         # Quick stats
-        summary = db.get_summary(user_id=st.session_state.user_id, start_date=date.today().replace(day=1))
+        summary = cached_summary(st.session_state.user_id, MONTH_START, db.get_transactions_version())
         st.markdown(f"""
         <div style="padding: 1rem; background: rgba(255,255,255,0.05); border-radius: 12px;">
             <p style="color: #94a3b8; font-size: 0.8rem; margin: 0;">This Month</p>
@@ -469,64 +452,34 @@ def render_dashboard():
     st.markdown(f"""
     <div class="main-header">
         <h1>💰 {get_greeting()}!</h1>
-        <p>Here's your financial overview for {datetime.now().strftime('%B %Y')}</p>
+        <p>Here's your financial overview for {TODAY.strftime('%B %Y')}</p>
     </div>
     """, unsafe_allow_html=True)
     
     # Get data
-    current_month_start = date.today().replace(day=1)
-    summary = db.get_summary(user_id=st.session_state.user_id, start_date=current_month_start)
-    insights = predictor.get_spending_insights(user_id=st.session_state.user_id)
-    
-    # Metric cards
-    col1, col2, col3, col4 = st.columns(4)
-    
-    with col1:
-        expense_change = insights['changes']['expense_change']
-        change_class = 'negative' if expense_change > 0 else 'positive'
-        change_icon = '↑' if expense_change > 0 else '↓'
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>💸 Total Expenses</h3>
-            <div class="value">{format_currency(summary['expense'])}</div>
-            <div class="change {change_class}">{change_icon} {abs(expense_change):.1f}% from last month</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        income_change = insights['changes']['income_change']
-        change_class = 'positive' if income_change > 0 else 'negative'
-        change_icon = '↑' if income_change > 0 else '↓'
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>💵 Total Income</h3>
-            <div class="value">{format_currency(summary['income'])}</div>
-            <div class="change {change_class}">{change_icon} {abs(income_change):.1f}% from last month</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col3:
-        balance = summary['balance']
-        balance_class = 'positive' if balance >= 0 else 'negative'
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>💰 Balance</h3>
-            <div class="value" style="color: {'#10B981' if balance >= 0 else '#EF4444'}">
-                {format_currency(balance)}
-            </div>
-            <div class="change">{days_remaining_in_month()} days left this month</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col4:
-        daily_avg = insights['daily_average']
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>📅 Daily Average</h3>
-            <div class="value">{format_currency(daily_avg)}</div>
-            <div class="change">Based on this month's spending</div>
-        </div>
-        """, unsafe_allow_html=True)
+    version = db.get_transactions_version()
+    summary = cached_summary(st.session_state.user_id, MONTH_START, version)
+    insights = cached_spending_insights(st.session_state.user_id, TODAY, version)
+    
+    # Metric cards, laid out by a CSS grid so the row is a single element
+    expense_change = insights['changes']['expense_change']
+    expense_class = 'negative' if expense_change > 0 else 'positive'
+    expense_icon = '↑' if expense_change > 0 else '↓'
+    income_change = insights['changes']['income_change']
+    income_class = 'positive' if income_change > 0 else 'negative'
+    income_icon = '↑' if income_change > 0 else '↓'
+    balance = summary['balance']
+    render_metric_grid(
+        metric_card("💸 Total Expenses", format_currency(summary['expense']),
+                    f"{expense_icon} {abs(expense_change):.1f}% from last month", change_class=expense_class),
+        metric_card("💵 Total Income", format_currency(summary['income']),
+                    f"{income_icon} {abs(income_change):.1f}% from last month", change_class=income_class),
+        metric_card("💰 Balance", format_currency(balance),
+                    f"{days_remaining_in_month()} days left this month",
+                    color='#10B981' if balance >= 0 else '#EF4444'),
+        metric_card("📅 Daily Average", format_currency(insights['daily_average']),
+                    "Based on this month's spending")
+    )
     
     st.markdown("<br>", unsafe_allow_html=True)
     
@@ -535,15 +488,17 @@ def render_dashboard():
     
     with col1:
         st.markdown("### 📊 Expense Breakdown")
-        breakdown = db.get_category_breakdown(user_id=st.session_state.user_id, start_date=current_month_start)
+        labels, totals = cached_category_breakdown(st.session_state.user_id, MONTH_START, version)
         
-        if breakdown:
-            fig = px.pie(
-                values=[c['total'] for c in breakdown],
-                names=[f"{c['icon']} {c['name']}" for c in breakdown],
-                color_discrete_sequence=generate_color_palette(len(breakdown)),
-                hole=0.4
-            )
+        if totals:
+            # go.Pie directly; px.pie routes through a DataFrame and takes ~40x longer
+            fig = go.Figure(go.Pie(
+                values=totals,
+                labels=labels,
+                marker=dict(colors=generate_color_palette(len(totals))),
+                hole=0.4,
+                sort=False  # already ordered by total in SQL
+            ))
             fig.update_layout(
                 paper_bgcolor='rgba(0,0,0,0)',
                 plot_bgcolor='rgba(0,0,0,0)',
@@ -557,9 +512,11 @@ def render_dashboard():
                     x=1.05
                 ),
                 margin=dict(l=20, r=20, t=30, b=20),
-                height=350
+                height=350,
+                transition_duration=0,
+                uirevision='breakdown'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         else:
             st.markdown("""
             <div class="empty-state">
@@ -570,15 +527,17 @@ def render_dashboard():
     
     with col2:
         st.markdown("### 📈 Monthly Trends")
-        trends = db.get_monthly_trends(user_id=st.session_state.user_id, months=6)
+        trends = cached_monthly_trends(st.session_state.user_id, 6, version)
         
         if not trends.empty:
             fig = go.Figure()
+            # Plain arrays skip Plotly's pandas introspection
+            months = trends['month'].to_numpy()
             
             if 'expense' in trends.columns:
                 fig.add_trace(go.Scatter(
-                    x=trends['month'],
-                    y=trends['expense'],
+                    x=months,
+                    y=trends['expense'].to_numpy(),
                     name='Expenses',
                     line=dict(color='#EF4444', width=3),
                     mode='lines+markers',
@@ -587,8 +546,8 @@ def render_dashboard():
             
             if 'income' in trends.columns:
                 fig.add_trace(go.Scatter(
-                    x=trends['month'],
-                    y=trends['income'],
+                    x=months,
+                    y=trends['income'].to_numpy(),
                     name='Income',
                     line=dict(color='#10B981', width=3),
                     mode='lines+markers',
@@ -619,9 +578,11 @@ def render_dashboard():
                 ),
                 margin=dict(l=20, r=20, t=30, b=20),
                 height=350,
-                hovermode='x unified'
+                hovermode='x unified',
+                transition_duration=0,
+                uirevision='trends'
             )
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(fig, use_container_width=True, config=PLOTLY_CONFIG)
         else:
             st.markdown("""
             <div class="empty-state">
@@ -635,24 +596,21 @@ def render_dashboard():
     
     with col1:
         st.markdown("### 📋 Recent Transactions")
-        recent = db.get_transactions(user_id=st.session_state.user_id, limit=5)
+        recent = cached_recent_transactions(st.session_state.user_id, 5, version)
         
         if recent:
-            for t in recent:
-                amount_class = 'amount-expense' if t['transaction_type'] == 'expense' else 'amount-income'
-                amount_prefix = '-' if t['transaction_type'] == 'expense' else '+'
-                st.markdown(f"""
-                <div class="transaction-item">
-                    <span class="transaction-icon">{t.get('category_icon', '📦')}</span>
-                    <div class="transaction-details">
-                        <div class="transaction-description">{t.get('description', 'No description')}</div>
-                        <div class="transaction-category">{t.get('category_name', 'Uncategorized')} • {format_date_friendly(t['date'])}</div>
-                    </div>
-                    <div class="transaction-amount {amount_class}">
-                        {amount_prefix}{format_currency(t['amount'])}
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("".join(
+                TRANSACTION_ITEM_HTML.format(
+                    icon=t.get('category_icon', '📦'),
+                    description=t.get('description', 'No description'),
+                    category=t.get('category_name', 'Uncategorized'),
+                    date=format_date_friendly(t['date'], TODAY),
+                    amount_class='amount-expense' if t['transaction_type'] == 'expense' else 'amount-income',
+                    prefix='-' if t['transaction_type'] == 'expense' else '+',
+                    amount=format_currency(t['amount'])
+                )
+                for t in recent
+            ), unsafe_allow_html=True)
         else:
             st.markdown("""
             <div class="empty-state">
@@ -663,20 +621,10 @@ def render_dashboard():
     
     with col2:
         st.markdown("### ⚠️ Alerts")
-        alerts = predictor.detect_overspending(user_id=st.session_state.user_id)
+        alerts = cached_overspending(st.session_state.user_id, TODAY, version)
         
         if alerts:
-            for alert in alerts[:3]:
-                severity_class = f"alert-{alert['severity']}"
-                st.markdown(f"""
-                <div class="alert-card {severity_class}">
-                    <span style="font-size: 1.5rem;">{alert['icon']}</span>
-                    <div>
-                        <strong>{alert['category']}</strong><br>
-                        <span style="font-size: 0.85rem; color: #94a3b8;">{alert['message']}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            render_alert_cards(alerts[:3])
         else:
             st.markdown("""
             <div style="text-align: center; padding: 2rem; color: #10B981;">
@@ -721,8 +669,8 @@ def render_add_transaction():
             with col_b:
                 transaction_date = st.date_input(
                     "Date",
-                    value=date.today(),
-                    max_value=date.today()
+                    value=TODAY,
+                    max_value=TODAY
                 )
             
             description = st.text_input(
@@ -732,27 +680,27 @@ def render_add_transaction():
             
             # AI-powered category suggestion
             suggested_category = None
-            if description:
-                predicted, confidence = categorizer.predict(description)
+            if description.strip():
+                predicted, confidence = get_categorizer().predict(description)
                 if confidence > 0.3:
                     suggested_category = predicted
                     st.info(f"🤖 AI suggests: **{predicted}** (Confidence: {confidence:.0%})")
             
             # Category selection
-            categories = db.get_categories(user_id=st.session_state.user_id, category_type=transaction_type)
-            category_options = {f"{c['icon']} {c['name']}": c['id'] for c in categories}
+            options = category_options(st.session_state.user_id, transaction_type)
+            labels = list(options)
             
             # Pre-select suggested category if available
             default_index = 0
             if suggested_category:
-                for i, (label, _) in enumerate(category_options.items()):
-                    if suggested_category in label:
-                        default_index = i
-                        break
+                category = db.get_category_index(st.session_state.user_id).by_lower_name.get(suggested_category.lower())
+                if category:
+                    positions = {label: i for i, label in enumerate(labels)}
+                    default_index = positions.get(f"{category['icon']} {category['name']}", 0)
             
             selected_category = st.selectbox(
                 "Category",
-                options=list(category_options.keys()),
+                options=labels,
                 index=default_index
             )
             
@@ -760,7 +708,7 @@ def render_add_transaction():
             
             if submitted:
                 if amount > 0 and description:
-                    category_id = category_options[selected_category]
+                    category_id = options[selected_category]
                     
                     db.add_transaction(
                         amount=amount,
@@ -830,12 +778,11 @@ def render_history():
         )
     
     with col3:
-        categories = db.get_categories(user_id=st.session_state.user_id)
-        category_options = {'All Categories': None}
-        category_options.update({f"{c['icon']} {c['name']}": c['id'] for c in categories})
+        options = {'All Categories': None}
+        options.update(category_options(st.session_state.user_id))
         category_filter = st.selectbox(
             "Category",
-            options=list(category_options.keys()),
+            options=list(options.keys()),
             index=0
         )
     
@@ -851,7 +798,7 @@ def render_history():
         'This Year': 'this_year',
         'All Time': 'all_time'
     }
-    start_date, end_date = get_date_range(period_map.get(period, 'this_month'))
+    start_date, end_date = get_date_range(period_map.get(period, 'this_month'), TODAY)
     
     # Type filter
     trans_type = None
@@ -861,24 +808,21 @@ def render_history():
         trans_type = 'income'
     
     # Category filter
-    cat_id = category_options[category_filter]
+    cat_id = options[category_filter]
     
     # Get transactions
-    transactions = db.get_transactions(
-        user_id=st.session_state.user_id,
-        start_date=start_date,
-        end_date=end_date,
-        transaction_type=trans_type,
-        category_id=cat_id
+    transactions = cached_transactions(
+        st.session_state.user_id, start_date, end_date, trans_type, cat_id, search,
+        db.get_transactions_version()
     )
     
-    # Filter by search
-    if search:
-        transactions = [t for t in transactions if search.lower() in t.get('description', '').lower()]
+    # One frame per rerun serves the totals and the export
+    df = pd.DataFrame(transactions)
     
     # Display summary
-    total_expense = sum(t['amount'] for t in transactions if t['transaction_type'] == 'expense')
-    total_income = sum(t['amount'] for t in transactions if t['transaction_type'] == 'income')
+    totals = df.groupby('transaction_type', sort=False)['amount'].sum() if transactions else {}
+    total_expense = totals.get('expense', 0.0)
+    total_income = totals.get('income', 0.0)
     
     col1, col2, col3 = st.columns(3)
     col1.metric("Total Transactions", len(transactions))
@@ -889,38 +833,36 @@ def render_history():
     
     if transactions:
         # Export option
-        if st.button("📥 Export to CSV"):
-            df = pd.DataFrame(transactions)
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="Download CSV",
-                data=csv,
-                file_name=f"transactions_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv"
-            )
+        render_history_export(df)
         
-        # Display transactions
-        for t in transactions:
-            col1, col2, col3, col4 = st.columns([0.5, 3, 1.5, 1])
-            
-            with col1:
-                st.markdown(f"<span style='font-size: 1.5rem;'>{t.get('category_icon', '📦')}</span>", unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown(f"**{t.get('description', 'No description')}**")
-                st.caption(f"{t.get('category_name', 'Uncategorized')} • {format_date_friendly(t['date'])}")
-            
-            with col3:
-                color = '#EF4444' if t['transaction_type'] == 'expense' else '#10B981'
-                prefix = '-' if t['transaction_type'] == 'expense' else '+'
-                st.markdown(f"<span style='color: {color}; font-weight: 600; font-size: 1.1rem;'>{prefix}{format_currency(t['amount'])}</span>", unsafe_allow_html=True)
-            
-            with col4:
-                if st.button("🗑️", key=f"del_{t['id']}", help="Delete transaction"):
-                    db.delete_transaction(t['id'], user_id=st.session_state.user_id)
-                    st.rerun()
-            
-            st.markdown("<hr style='margin: 0.5rem 0; border-color: rgba(255,255,255,0.1);'>", unsafe_allow_html=True)
+        # Display transactions as one virtualised table rather than a row of
+        # widgets per transaction; select rows to delete them. Its columns are
+        # derived from the shared frame, row i still being transactions[i].
+        sign = df['transaction_type'].map({'expense': '-'}).fillna('+')
+        table = pd.DataFrame({
+            'Category': df['category_icon'].fillna('📦') + ' ' + df['category_name'].fillna('Uncategorized'),
+            'Description': df['description'].fillna('No description'),
+            'Date': df['date'].map(lambda d: format_date_friendly(d, TODAY)),
+            'Amount': sign + format_currency_series(df['amount']),
+        })
+        event = st.dataframe(
+            table,
+            hide_index=True,
+            use_container_width=True,
+            on_select='rerun',
+            selection_mode='multi-row',
+            column_config={
+                'Category': st.column_config.TextColumn(width='medium'),
+                'Description': st.column_config.TextColumn(width='large'),
+                'Date': st.column_config.TextColumn(width='small'),
+                'Amount': st.column_config.TextColumn(width='small'),
+            }
+        )
+        
+        selected = event.selection.rows
+        if selected and st.button(f"🗑️ Delete {len(selected)} selected", help="Delete the selected transactions"):
+            db.delete_transactions_bulk(df['id'].iloc[selected].tolist(), user_id=st.session_state.user_id)
+            st.rerun()
     else:
         st.markdown("""
         <div class="empty-state">
@@ -930,6 +872,19 @@ def render_history():
         """, unsafe_allow_html=True)
 
 
+@st.fragment
+def render_history_export(df):
+    """Export button for the filtered list; clicks rerun only this fragment."""
+    if st.button("📥 Export to CSV"):
+        csv = df.to_csv(index=False)
+        st.download_button(
+            label="Download CSV",
+            data=csv,
+            file_name=f"transactions_{TODAY.strftime('%Y%m%d')}.csv",
+            mime="text/csv"
+        )
+
+
 # ==================== AI Insights Page ====================
 def render_insights():
     """Render AI-powered insights."""
@@ -940,41 +895,22 @@ def render_insights():
     </div>
     """, unsafe_allow_html=True)
     
-    # Predictions
-    st.markdown("### 🔮 Next Month Prediction")
-    predictions = predictor.predict_next_month_expenses(user_id=st.session_state.user_id)
-    
-    col1, col2, col3 = st.columns(3)
-    
-    with col1:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Predicted Expenses</h3>
-            <div class="value" style="color: #EF4444;">{format_currency(predictions['predicted_expense'])}</div>
-            <div class="change">Confidence: {predictions['confidence'].upper()}</div>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    with col2:
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Predicted Income</h3>
-            <div class="value" style="color: #10B981;">{format_currency(predictions['predicted_income'])}</div>
-            <div class="change">Based on {6} months history</div>
-        </div>
-        """, unsafe_allow_html=True)
+    # Predictions, recommendations, alerts and patterns from one cached call
+    bundle = cached_all_insights(st.session_state.user_id, TODAY, db.get_transactions_version())
     
-    with col3:
-        savings = predictions.get('predicted_savings', predictions.get('predicted_income', 0) - predictions.get('predicted_expense', 0))
-        st.markdown(f"""
-        <div class="metric-card">
-            <h3>Predicted Savings</h3>
-            <div class="value" style="color: {'#10B981' if savings >= 0 else '#EF4444'};">
-                {format_currency(savings)}
-            </div>
-            <div class="change">{'On track!' if savings >= 0 else 'Consider reducing expenses'}</div>
-        </div>
-        """, unsafe_allow_html=True)
+    st.markdown("### 🔮 Next Month Prediction")
+    predictions = bundle['predictions']
+    
+    savings = predictions.get('predicted_savings', predictions.get('predicted_income', 0) - predictions.get('predicted_expense', 0))
+    render_metric_grid(
+        metric_card("Predicted Expenses", format_currency(predictions['predicted_expense']),
+                    f"Confidence: {predictions['confidence'].upper()}", color='#EF4444'),
+        metric_card("Predicted Income", format_currency(predictions['predicted_income']),
+                    "Based on 6 months history", color='#10B981'),
+        metric_card("Predicted Savings", format_currency(savings),
+                    'On track!' if savings >= 0 else 'Consider reducing expenses',
+                    color='#10B981' if savings >= 0 else '#EF4444')
+    )
     
     st.info(predictions['message'])
     
@@ -985,43 +921,27 @@ def render_insights():
     
     with col1:
         st.markdown("### 💡 Smart Recommendations")
-        recommendations = predictor.get_recommendations(user_id=st.session_state.user_id)
+        recommendations = bundle['recommendations']
         
         if recommendations:
-            for rec in recommendations:
-                priority_color = {
-                    'high': '#EF4444',
-                    'medium': '#F59E0B',
-                    'low': '#10B981'
-                }.get(rec['priority'], '#94a3b8')
-                
-                st.markdown(f"""
-                <div class="recommendation-card">
-                    <div class="recommendation-title">
-                        <span style="color: {priority_color};">●</span> {rec['icon']} {rec['title']}
-                    </div>
-                    <div class="recommendation-text">{rec['description']}</div>
-                </div>
-                """, unsafe_allow_html=True)
+            st.markdown("".join(
+                RECOMMENDATION_CARD_HTML.format(
+                    priority_color=PRIORITY_COLORS.get(rec['priority'], '#94a3b8'),
+                    icon=rec['icon'],
+                    title=rec['title'],
+                    description=rec['description']
+                )
+                for rec in recommendations
+            ), unsafe_allow_html=True)
         else:
             st.info("Add more transactions to get personalized recommendations!")
     
     with col2:
         st.markdown("### ⚠️ Spending Alerts")
-        alerts = predictor.detect_overspending(user_id=st.session_state.user_id)
+        alerts = bundle['alerts']
         
         if alerts:
-            for alert in alerts:
-                severity_class = f"alert-{alert['severity']}"
-                st.markdown(f"""
-                <div class="alert-card {severity_class}">
-                    <span style="font-size: 1.5rem;">{alert['icon']}</span>
-                    <div>
-                        <strong>{alert['category']}</strong><br>
-                        <span style="font-size: 0.85rem; color: #94a3b8;">{alert['message']}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+            render_alert_cards(alerts)
         else:
             st.success("🎉 Great job! No spending issues detected.")
     
@@ -1030,31 +950,25 @@ def render_insights():
     # Spending patterns
     st.markdown("### 📊 Spending Pattern Analysis")
     
-    insights = predictor.get_spending_insights(user_id=st.session_state.user_id)
+    insights = bundle['insights']
     
     col1, col2 = st.columns(2)
     
     with col1:
         if insights['biggest_expense_category']:
             cat = insights['biggest_expense_category']
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>{cat['icon']} Top Spending Category</h3>
-                <div class="value">{cat['name']}</div>
-                <div class="change">{format_currency(cat['total'])} this month ({cat['count']} transactions)</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(metric_card(
+                f"{cat['icon']} Top Spending Category", cat['name'],
+                f"{format_currency(cat['total'])} this month ({cat['count']} transactions)"
+            ), unsafe_allow_html=True)
     
     with col2:
         if insights['most_frequent_category']:
             cat = insights['most_frequent_category']
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3>{cat['icon']} Most Frequent Category</h3>
-                <div class="value">{cat['name']}</div>
-                <div class="change">{cat['count']} transactions this month</div>
-            </div>
-            """, unsafe_allow_html=True)
+            st.markdown(metric_card(
+                f"{cat['icon']} Most Frequent Category", cat['name'],
+                f"{cat['count']} transactions this month"
+            ), unsafe_allow_html=True)
 
 
 # ==================== Budgets Page ====================
@@ -1072,13 +986,12 @@ def render_budgets():
     
     col1, col2, col3 = st.columns([2, 2, 1])
     
-    expense_categories = db.get_categories(user_id=st.session_state.user_id, category_type='expense')
-    category_options = {f"{c['icon']} {c['name']}": c['id'] for c in expense_categories}
+    options = category_options(st.session_state.user_id, 'expense')
     
     with col1:
         selected_category = st.selectbox(
             "Category",
-            options=list(category_options.keys())
+            options=list(options.keys())
         )
     
     with col2:
@@ -1092,7 +1005,7 @@ def render_budgets():
     with col3:
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("Set Budget", use_container_width=True):
-            category_id = category_options[selected_category]
+            category_id = options[selected_category]
             db.set_budget(category_id, st.session_state.user_id, budget_amount)
             st.success("Budget set successfully!")
             st.rerun()
@@ -1102,9 +1015,10 @@ def render_budgets():
     # Budget status
     st.markdown("### 📊 Current Budget Status")
     
-    budget_status = db.get_budget_status(user_id=st.session_state.user_id)
+    budget_status = cached_budget_status(st.session_state.user_id, TODAY, db.get_transactions_version())
     
     if budget_status:
+        rows = []
         for item in budget_status:
             percentage = min(item['percentage'], 100)
             remaining = item['remaining']
@@ -1120,26 +1034,18 @@ def render_budgets():
                 bar_color = '#10B981'
                 status_text = '✅ On track'
             
-            st.markdown(f"""
-            <div style="background: rgba(255,255,255,0.05); padding: 1rem; border-radius: 12px; margin-bottom: 1rem;">
-                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 0.5rem;">
-                    <span style="font-size: 1.1rem;">
-                        <strong>{item['icon']} {item['name']}</strong>
-                    </span>
-                    <span style="color: #94a3b8;">{status_text}</span>
-                </div>
-                <div class="budget-progress">
-                    <div class="budget-progress-fill" style="width: {percentage}%; background: {bar_color};"></div>
-                </div>
-                <div style="display: flex; justify-content: space-between; margin-top: 0.5rem; color: #94a3b8; font-size: 0.85rem;">
-                    <span>Spent: {format_currency(item['spent'])}</span>
-                    <span>Limit: {format_currency(item['monthly_limit'])}</span>
-                    <span style="color: {'#10B981' if remaining >= 0 else '#EF4444'};">
-                        {'Remaining: ' + format_currency(remaining) if remaining >= 0 else 'Over by: ' + format_currency(abs(remaining))}
-                    </span>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
+            rows.append(BUDGET_ROW_HTML.format(
+                icon=item['icon'],
+                name=item['name'],
+                status_text=status_text,
+                percentage=percentage,
+                bar_color=bar_color,
+                spent=format_currency(item['spent']),
+                limit=format_currency(item['monthly_limit']),
+                remaining_color='#10B981' if remaining >= 0 else '#EF4444',
+                remaining_text='Remaining: ' + format_currency(remaining) if remaining >= 0 else 'Over by: ' + format_currency(abs(remaining))
+            ))
+        st.markdown("".join(rows), unsafe_allow_html=True)
     else:
         st.markdown("""
         <div class="empty-state">
@@ -1165,7 +1071,7 @@ def render_settings():
     tab1, tab2 = st.tabs(["Expense Categories", "Income Categories"])
     
     with tab1:
-        expense_cats = db.get_categories(user_id=st.session_state.user_id, category_type='expense')
+        expense_cats = db.get_category_index(st.session_state.user_id).by_type.get('expense', [])
         
         for cat in expense_cats:
             col1, col2 = st.columns([4, 1])
@@ -1192,7 +1098,7 @@ def render_settings():
                     st.rerun()
     
     with tab2:
-        income_cats = db.get_categories(user_id=st.session_state.user_id, category_type='income')
+        income_cats = db.get_category_index(st.session_state.user_id).by_type.get('income', [])
         
         for cat in income_cats:
             col1, col2 = st.columns([4, 1])
@@ -1233,18 +1139,7 @@ def render_settings():
         </div>
         """, unsafe_allow_html=True)
         
-        if st.button("Export All Data", use_container_width=True):
-            df = db.get_transactions_dataframe(user_id=st.session_state.user_id)
-            if not df.empty:
-                csv = df.to_csv(index=False)
-                st.download_button(
-                    label="📥 Download CSV",
-                    data=csv,
-                    file_name=f"expense_tracker_export_{datetime.now().strftime('%Y%m%d')}.csv",
-                    mime="text/csv"
-                )
-            else:
-                st.warning("No data to export!")
+        render_full_export()
     
     with col2:
         st.markdown("""
@@ -1279,6 +1174,8 @@ def render_settings():
         st.markdown("<br>", unsafe_allow_html=True)
         if st.button("Save API Key", use_container_width=True):
             db.set_setting('gemini_api_key', new_api_key, user_id=st.session_state.user_id)
+            from ml.assistant import AIAssistant
+            AIAssistant.forget_api_key(st.session_state.user_id)
             st.success("API Key saved!")
             st.rerun()
             
@@ -1313,7 +1210,26 @@ def render_settings():
     """, unsafe_allow_html=True)
 
 
+@st.fragment
+def render_full_export():
+    """Export-all button; clicks rerun only this fragment."""
+    if st.button("Export All Data", use_container_width=True):
+        buffer = io.StringIO()
+        if db.write_transactions_csv(st.session_state.user_id, buffer):
+            st.download_button(
+                label="📥 Download CSV",
+                data=buffer.getvalue(),
+                file_name=f"expense_tracker_export_{TODAY.strftime('%Y%m%d')}.csv",
+                mime="text/csv"
+            )
+        else:
+            st.warning("No data to export!")
+
+
 # ==================== AI Chat Assistant Page ====================
+# Opening message of a new chat; fixed text, so no assistant (or Gemini) call
+CHAT_WELCOME_MESSAGE = "Hello! 👋 I'm your AI expense assistant. How can I help you today?"
+
 def render_chat():
     """Render the AI chat assistant page."""
     st.markdown("""
@@ -1324,15 +1240,14 @@ def render_chat():
     """, unsafe_allow_html=True)
     
     # Quick insights bar
-    insights = assistant.get_quick_insights(user_id=st.session_state.user_id)
+    insights = cached_quick_insights(st.session_state.user_id, TODAY, db.get_transactions_version())
     st.info(f"📊 **Quick Insight:** {insights}")
     
     # Initialize chat with welcome message if empty
     if not st.session_state.chat_messages:
-        welcome = assistant.process_message("hi", user_id=st.session_state.user_id)
         st.session_state.chat_messages.append({
             'role': 'assistant',
-            'content': welcome['response']
+            'content': CHAT_WELCOME_MESSAGE
         })
     
     # Display chat messages using Streamlit's native chat components
@@ -1358,20 +1273,27 @@ def render_chat():
         with st.chat_message("user", avatar="👤"):
             st.markdown(user_input)
         
-        # Get AI response
-        response = assistant.process_message(user_input, user_id=st.session_state.user_id)
+        # Get AI response, streaming Gemini replies as they arrive
+        response = create_assistant().process_message(user_input, user_id=st.session_state.user_id, stream=True)
+        
+        # Display assistant response
+        with st.chat_message("assistant", avatar="🤖"):
+            if response.get('stream') is not None:
+                placeholder = st.empty()
+                streamed = ''
+                for chunk in response['stream']:
+                    streamed += chunk
+                    placeholder.markdown(streamed)
+                placeholder.markdown(response['response'])
+            else:
+                st.markdown(response['response'])
         
-        # Add assistant response
+        # Add assistant response; both messages are already on screen, so no
+        # rerun to draw the whole history again
         st.session_state.chat_messages.append({
             'role': 'assistant',
             'content': response['response']
         })
-        
-        # Display assistant response
-        with st.chat_message("assistant", avatar="🤖"):
-            st.markdown(response['response'])
-        
-        st.rerun()
     
     st.markdown("---")
     
@@ -1382,22 +1304,22 @@ def render_chat():
     with col1:
         if st.button("💰 Check Balance", use_container_width=True):
             st.session_state.chat_messages.append({'role': 'user', 'content': 'What is my balance?'})
-            response = assistant.process_message('what is my balance', user_id=st.session_state.user_id)
-            st.session_state.chat_messages.append({'role': 'assistant', 'content': response['response']})
+            reply = cached_quick_action_reply(st.session_state.user_id, 'what is my balance', TODAY, db.get_transactions_version())
+            st.session_state.chat_messages.append({'role': 'assistant', 'content': reply})
             st.rerun()
     
     with col2:
         if st.button("📊 View Spending", use_container_width=True):
             st.session_state.chat_messages.append({'role': 'user', 'content': 'Show my spending'})
-            response = assistant.process_message('show my spending', user_id=st.session_state.user_id)
-            st.session_state.chat_messages.append({'role': 'assistant', 'content': response['response']})
+            reply = cached_quick_action_reply(st.session_state.user_id, 'show my spending', TODAY, db.get_transactions_version())
+            st.session_state.chat_messages.append({'role': 'assistant', 'content': reply})
             st.rerun()
     
     with col3:
         if st.button("📋 Recent Transactions", use_container_width=True):
             st.session_state.chat_messages.append({'role': 'user', 'content': 'Show recent transactions'})
-            response = assistant.process_message('show recent transactions', user_id=st.session_state.user_id)
-            st.session_state.chat_messages.append({'role': 'assistant', 'content': response['response']})
+            reply = cached_quick_action_reply(st.session_state.user_id, 'show recent transactions', TODAY, db.get_transactions_version())
+            st.session_state.chat_messages.append({'role': 'assistant', 'content': reply})
             st.rerun()
     
     with col4:
@@ -1420,7 +1342,7 @@ def render_chat():
         with col:
             if st.button(f"'{example}'", key=f"example_{i}", use_container_width=True):
                 st.session_state.chat_messages.append({'role': 'user', 'content': example})
-                response = assistant.process_message(example, user_id=st.session_state.user_id)
+                response = create_assistant().process_message(example, user_id=st.session_state.user_id)
                 st.session_state.chat_messages.append({'role': 'assistant', 'content': response['response']})
                 st.rerun()
 
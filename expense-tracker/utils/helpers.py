@@ -3,9 +3,14 @@ Utility functions for the Expense Tracker application
 """
 
 from datetime import datetime, date, timedelta
+from functools import lru_cache
+from itertools import cycle, islice
 from typing import Optional, Union
 import calendar
 
+import numpy as np
+import pandas as pd
+
 
 def format_currency(amount: float, symbol: str = '₹') -> str:
     """Format amount as currency string."""
@@ -15,6 +20,12 @@ def format_currency(amount: float, symbol: str = '₹') -> str:
         return f"-{symbol}{abs(amount):,.2f}"
 
 
+def format_currency_series(amounts: pd.Series, symbol: str = '₹') -> pd.Series:
+    """Format a column of amounts like format_currency, in one pass over the column."""
+    sign = pd.Series(np.where(amounts < 0, f"-{symbol}", symbol), index=amounts.index)
+    return sign + amounts.abs().map('{:,.2f}'.format)
+
+
 def format_currency_compact(amount: float, symbol: str = '₹') -> str:
     """Format large amounts in compact form (K, L, Cr)."""
     if amount >= 10000000:  # 1 Crore
@@ -27,11 +38,24 @@ def format_currency_compact(amount: float, symbol: str = '₹') -> str:
         return f"{symbol}{amount:.0f}"
 
 
+# Formats accepted by parse_date, tried in order
+_DATE_FORMATS = ('%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d')
+
+
+@lru_cache(maxsize=8192)
 def parse_date(date_str: str) -> Optional[date]:
-    """Parse date string to date object."""
-    formats = ['%Y-%m-%d', '%d-%m-%Y', '%d/%m/%Y', '%Y/%m/%d']
+    """
+    Parse date string to date object.
     
-    for fmt in formats:
+    Memoised: the same few dates repeat across every row of a rendered list.
+    Zero-padded ISO, the database's storage format, skips strptime entirely.
+    """
+    try:
+        return date.fromisoformat(date_str[:10])
+    except ValueError:
+        pass
+    
+    for fmt in _DATE_FORMATS:
         try:
             return datetime.strptime(date_str, fmt).date()
         except ValueError:
@@ -40,52 +64,45 @@ def parse_date(date_str: str) -> Optional[date]:
     return None
 
 
-def get_date_range(period: str) -> tuple:
+def _last_month(today: date) -> tuple:
+    """First and last day of the month before today's."""
+    last_month_end = today.replace(day=1) - timedelta(days=1)
+    return last_month_end.replace(day=1), last_month_end
+
+
+# (start_date, end_date) for each period, given today's date
+_DATE_RANGES = {
+    'today': lambda today: (today, today),
+    'this_week': lambda today: (today - timedelta(days=today.weekday()), today),
+    'this_month': lambda today: (today.replace(day=1), today),
+    'last_month': _last_month,
+    'this_year': lambda today: (today.replace(month=1, day=1), today),
+    'last_30_days': lambda today: (today - timedelta(days=30), today),
+    'last_90_days': lambda today: (today - timedelta(days=90), today),
+    'all_time': lambda today: (None, None),
+}
+
+
+def get_date_range(period: str, today: date = None) -> tuple:
     """
     Get start and end dates for common periods.
     
     Args:
         period: 'today', 'this_week', 'this_month', 'last_month', 
-                'this_year', 'last_30_days', 'last_90_days'
+                'this_year', 'last_30_days', 'last_90_days', 'all_time';
+                anything else means 'this_month'
+        today: Date the range is relative to (defaults to today)
     
     Returns:
         Tuple of (start_date, end_date)
     """
-    today = date.today()
-    
-    if period == 'today':
-        return today, today
-    
-    elif period == 'this_week':
-        start = today - timedelta(days=today.weekday())
-        return start, today
-    
-    elif period == 'this_month':
-        start = today.replace(day=1)
-        return start, today
-    
-    elif period == 'last_month':
-        last_month_end = today.replace(day=1) - timedelta(days=1)
-        last_month_start = last_month_end.replace(day=1)
-        return last_month_start, last_month_end
-    
-    elif period == 'this_year':
-        start = today.replace(month=1, day=1)
-        return start, today
-    
-    elif period == 'last_30_days':
-        start = today - timedelta(days=30)
-        return start, today
-    
-    elif period == 'last_90_days':
-        start = today - timedelta(days=90)
-        return start, today
-    
-    elif period == 'all_time':
-        return None, None
-    
-    else:
-        return today.replace(day=1), today
+    return _date_range(period, today or date.today())
+
+
+@lru_cache(maxsize=64)
+def _date_range(period: str, today: date) -> tuple:
+    """get_date_range for a fixed day; a handful of periods repeat all day."""
+    return _DATE_RANGES.get(period, _DATE_RANGES['this_month'])(today)
 
 
 def get_month_name(month: int) -> str:
@@ -135,25 +152,44 @@ def days_remaining_in_month() -> int:
     return last_day - today.day
 
 
+def _ordinal_suffix(n: int) -> str:
+    """English ordinal suffix for n ('st', 'nd', 'rd' or 'th')."""
+    if 10 <= n % 100 <= 20:
+        return 'th'
+    return {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th')
+
+
+# Suffixes for days of the month, indexed by day
+_DAY_SUFFIXES = tuple(_ordinal_suffix(day) for day in range(32))
+
+
 def get_ordinal_suffix(day: int) -> str:
     """Get ordinal suffix for a day number."""
-    if 10 <= day % 100 <= 20:
-        suffix = 'th'
-    else:
-        suffix = {1: 'st', 2: 'nd', 3: 'rd'}.get(day % 10, 'th')
-    return f"{day}{suffix}"
+    if 0 <= day < len(_DAY_SUFFIXES):
+        return f"{day}{_DAY_SUFFIXES[day]}"
+    return f"{day}{_ordinal_suffix(day)}"
 
 
-def format_date_friendly(d: Union[date, str]) -> str:
-    """Format date in a friendly, readable format."""
+def format_date_friendly(d: Union[date, str], today: date = None) -> str:
+    """
+    Format date in a friendly, readable format.
+    
+    Args:
+        d: Date or date string
+        today: Date the wording is relative to (defaults to today)
+    """
     if isinstance(d, str):
         d = parse_date(d)
     
     if d is None:
         return "Unknown"
     
-    today = date.today()
-    
+    return _format_date_friendly(d, today or date.today())
+
+
+@lru_cache(maxsize=4096)
+def _format_date_friendly(d: date, today: date) -> str:
+    """format_date_friendly for a fixed day; a list repeats the same few dates."""
     if d == today:
         return "Today"
     elif d == today - timedelta(days=1):
@@ -166,23 +202,23 @@ def format_date_friendly(d: Union[date, str]) -> str:
         return d.strftime("%b %d, %Y")  # Month Day, Year
 
 
-def generate_color_palette(n: int) -> list:
-    """Generate a pleasing color palette for charts."""
-    base_colors = [
-        '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7',
-        '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9',
-        '#F8B500', '#82E0AA', '#F1948A', '#85929E', '#76D7C4'
-    ]
-    
-    if n <= len(base_colors):
-        return base_colors[:n]
-    
-    # If more colors needed, repeat with variations
-    extended = base_colors.copy()
-    while len(extended) < n:
-        extended.extend(base_colors)
+# Chart colors, built once at import rather than on every palette request
+_BASE_COLORS = (
+    '#FF6B6B', '#4ECDC4', '#45B7D1', '#96CEB4', '#FFEAA7',
+    '#DDA0DD', '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E9',
+    '#F8B500', '#82E0AA', '#F1948A', '#85929E', '#76D7C4'
+)
+
+
+@lru_cache(maxsize=64)
+def generate_color_palette(n: int) -> tuple:
+    """
+    Generate a pleasing color palette for charts.
     
-    return extended[:n]
+    Cycles the base colors when more are needed. The tuple is cached per n
+    and shared, so callers that modify it should take a list() copy.
+    """
+    return tuple(islice(cycle(_BASE_COLORS), max(n, 0)))
 
 
 def truncate_text(text: str, max_length: int = 30) -> str: